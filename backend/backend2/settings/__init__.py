@@ -0,0 +1,8 @@
+"""
+Settings profiles for backend2.
+
+`backend2.settings` is the development profile (the base settings as-is).
+Deployments set DJANGO_SETTINGS_MODULE=backend2.settings.prod.
+"""
+
+from .base import *  # noqa: F401,F403
@@ -0,0 +1,291 @@
+"""
+Base Django settings for backend2 project, shared by every profile.
+
+Generated by 'django-admin startproject' using Django 5.1.4.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.1/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/5.1/ref/settings/
+"""
+
+import os
+from pathlib import Path
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/5.1/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = 'django-insecure-#dotvhn+ed5ocf^$nneep7+066vvq*%ev@&m!c)9^dp0s*$-pv'
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = True
+
+ALLOWED_HOSTS = []
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'rest_framework',
+    'corsheaders',
+    'rest_framework_simplejwt',
+    'myapp',
+]
+
+MIDDLEWARE = [
+    'myapp.middleware.RequestTimingMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'backend2.urls'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'backend2.wsgi.application'
+
+
+# Database
+# https://docs.djangoproject.com/en/5.1/ref/settings/#databases
+
+# DB_ENGINE=postgresql switches to PostgreSQL configured from the DB_*
+# variables below; otherwise the local SQLite file is used.
+
+if os.environ.get('DB_ENGINE') == 'postgresql':
+    # Django 5.1's native psycopg pool replaces persistent connections; the
+    # two can't be combined, so CONN_MAX_AGE only applies without the pool
+    DB_POOL = os.environ.get('DB_POOL', '').lower() in ('1', 'true', 'yes')
+
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'backend2'),
+            'USER': os.environ.get('DB_USER', ''),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', ''),
+            'PORT': os.environ.get('DB_PORT', ''),
+            'CONN_MAX_AGE': 0 if DB_POOL else int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+                    'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+                    'timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+                },
+            } if DB_POOL else {},
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': BASE_DIR / 'db.sqlite3',
+            'OPTIONS': {
+                # Take the write lock when a transaction starts instead of
+                # failing to upgrade a read lock halfway through it
+                'transaction_mode': 'IMMEDIATE',
+            },
+            # A file rather than the shared-cache in-memory default, so tests
+            # that write from several threads get SQLite's normal locking
+            'TEST': {
+                'NAME': BASE_DIR / 'test_db.sqlite3',
+            },
+        }
+    }
+
+# Applied to every new SQLite connection by myapp.signals, together with
+# journal_mode=WAL and synchronous=NORMAL
+SQLITE_BUSY_TIMEOUT_MS = int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000))
+
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+# Local memory works for a single process; point this at Redis or Memcached
+# in production so every worker shares the meal response cache.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+# Seconds a rendered meal list/detail response stays cached. Writes bump the
+# catalogue version, so this only bounds memory use, not staleness.
+MEAL_CACHE_TIMEOUT = 300
+
+# Most recent reviews embedded in a meal payload; the full list is paged
+# through GET /api/meals/<id>/reviews/
+MEAL_EMBEDDED_REVIEWS = 5
+
+# ?q= searches ordered by relevance score only this many of the newest
+# matches, which keeps a common word fast (see myapp.search)
+SEARCH_RANKED_MATCHES = 1000
+
+# Seconds a user's is_active is trusted from the cache by token
+# authentication; deactivation elsewhere (admin, other workers) takes at
+# most this long to reject their tokens
+AUTH_ACTIVE_CACHE_TIMEOUT = 30
+
+
+# Meal rankings (myapp.rankings)
+# Bayesian scores blend each meal's reviews with RANKING_PRIOR_WEIGHT reviews
+# of RANKING_PRIOR_RATING. Trending weight halves every half-life; changing
+# any of these needs `manage.py rebuild_meal_rankings`.
+
+RANKING_PRIOR_RATING = 3.0
+RANKING_PRIOR_WEIGHT = 5
+RANKING_TRENDING_HALF_LIFE_HOURS = 72
+
+
+# Request instrumentation (myapp.middleware.RequestTimingMiddleware)
+# Every response gets a Server-Timing header; requests at or over either
+# threshold are logged to `myapp.performance` with their slowest queries.
+
+REQUEST_TIMING_SLOW_MS = int(os.environ.get('REQUEST_TIMING_SLOW_MS', 500))
+REQUEST_TIMING_QUERY_LIMIT = int(os.environ.get('REQUEST_TIMING_QUERY_LIMIT', 30))
+REQUEST_TIMING_SLOWEST_QUERIES = 3
+# Slow by design: password hashing takes about half a second per attempt
+REQUEST_TIMING_UNLOGGED_VIEWS = ('signin', 'signup')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'myapp.performance': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
+    },
+}
+
+
+# Password validation
+# https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Password hashing
+# https://docs.djangoproject.com/en/5.1/topics/auth/passwords/
+# PBKDF2 cost is tunable per deployment; existing hashes are upgraded or
+# downgraded transparently on the next successful login.
+
+PASSWORD_HASHERS = [
+    'myapp.hashers.ConfigurablePBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+
+# None keeps Django's default iteration count
+PASSWORD_HASH_ITERATIONS = int(os.environ.get('PASSWORD_HASH_ITERATIONS', 0)) or None
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/5.1/topics/i18n/
+
+LANGUAGE_CODE = 'en-us'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/5.1/howto/static-files/
+
+STATIC_URL = 'static/'
+
+# Default primary key field type
+# https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
+
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# CORS settings
+CORS_ALLOW_ALL_ORIGINS = True
+
+# REST Framework settings
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'myapp.authentication.ClaimsJWTAuthentication',
+    ],
+    # orjson-backed JSON with a stdlib fallback; same JSON as DRF's classes
+    'DEFAULT_RENDERER_CLASSES': [
+        'myapp.renderers.ORJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'myapp.parsers.ORJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+    # Reverse proxies in front of the app. Throttles key on the address this
+    # many hops from the right of X-Forwarded-For, or on REMOTE_ADDR when 0;
+    # DRF's default (None) trusts the whole client-supplied header.
+    'NUM_PROXIES': int(os.environ.get('NUM_PROXIES', 0)),
+    # Token buckets for the auth endpoints: 'N/period' allows bursts of N
+    'DEFAULT_THROTTLE_RATES': {
+        'signin_ip': '30/min',
+        'signin_email': '5/min',
+        'signup_ip': '10/min',
+    },
+}
+
+# JWT settings
+SIMPLE_JWT = {
+    'TOKEN_OBTAIN_SERIALIZER': 'myapp.serializers.ClaimsTokenObtainPairSerializer',
+}
@@ -0,0 +1,54 @@
+"""
+Production settings for backend2: a JSON-only API behind JWT auth.
+
+The admin, sessions and messages apps are left out, which lets the
+middleware chain shrink to what the API actually uses. DEBUG is off, so
+Django no longer keeps every executed query in memory.
+"""
+
+import os
+
+from .base import *  # noqa: F401,F403
+from .base import INSTALLED_APPS, REST_FRAMEWORK, TEMPLATES
+
+SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+
+DEBUG = False
+
+ALLOWED_HOSTS = [host for host in os.environ.get('DJANGO_ALLOWED_HOSTS', '').split(',') if host]
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    app for app in INSTALLED_APPS
+    if app not in (
+        'django.contrib.admin',
+        'django.contrib.sessions',
+        'django.contrib.messages',
+        'django.contrib.staticfiles',
+    )
+]
+
+# The API authenticates every request from its bearer token, so there is
+# no session, CSRF cookie, messages or frame-options work to do. Request
+# timing stays on; its per-query cost is negligible
+MIDDLEWARE = [
+    'myapp.middleware.RequestTimingMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'corsheaders.middleware.CorsMiddleware',
+    'django.middleware.common.CommonMiddleware',
+]
+
+TEMPLATES = [{**TEMPLATES[0], 'OPTIONS': {'context_processors': []}}]
+
+
+# REST Framework settings
+# API_JSON_RENDERER can swap the JSON renderer for another JSONRenderer subclass
+
+REST_FRAMEWORK = {
+    **REST_FRAMEWORK,
+    'DEFAULT_RENDERER_CLASSES': [
+        os.environ.get('API_JSON_RENDERER', 'myapp.renderers.ORJSONRenderer'),
+    ],
+}
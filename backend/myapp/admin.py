@@ -1,5 +1,6 @@
 from django.contrib import admin
 from .models import Meal
+from .cache import bump_catalogue_version
 
 @admin.register(Meal)
 class MealAdmin(admin.ModelAdmin):
@@ -7,3 +8,15 @@ class MealAdmin(admin.ModelAdmin):
     list_filter = ('created_at', 'updated_at')
     search_fields = ('title',)
     ordering = ('-created_at',)
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        bump_catalogue_version()
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        bump_catalogue_version()
+
+    def delete_queryset(self, request, queryset):
+        super().delete_queryset(request, queryset)
+        bump_catalogue_version()
@@ -0,0 +1,122 @@
+"""
+ASGI-native read endpoints for meals and the cart.
+
+These mirror the GET side of MealListCreateView, MealDetailView and
+get_cart but run on Django's async ORM, so under an ASGI server a request
+waiting on the database doesn't hold a worker thread. DRF views are sync
+only, hence plain Django views with JWT authentication done by hand.
+"""
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.http import HttpResponse
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
+
+from .authentication import ais_user_active, user_from_claims
+from .models import Meal, CartItem
+from .pagination import KeysetPagination
+from .renderers import ORJSONRenderer
+from .search import search_meals
+from .serializers import MealSerializer, CartItemSerializer, meal_values
+from .fieldsets import get_fields
+from .views import include_reviews, meal_queryset
+
+
+def json_response(data, status=200):
+    return HttpResponse(ORJSONRenderer().render(data), content_type='application/json', status=status)
+
+
+async def authenticate(request):
+    """Resolve the bearer token to an active user, or None"""
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = authentication.get_raw_token(header) if header else None
+    if raw_token is None:
+        return None
+
+    try:
+        token = authentication.get_validated_token(raw_token)
+        user_id = token[api_settings.USER_ID_CLAIM]
+    except (InvalidToken, TokenError, KeyError):
+        return None
+
+    # Same claims fast path as ClaimsJWTAuthentication
+    user = user_from_claims(token)
+    if user is not None:
+        return user if user.is_active and await ais_user_active(user.pk) else None
+
+    try:
+        user = await User.objects.aget(**{api_settings.USER_ID_FIELD: user_id})
+    except User.DoesNotExist:
+        return None
+    return user if user.is_active else None
+
+
+def login_required(view):
+    async def wrapper(request, *args, **kwargs):
+        if request.method != 'GET':
+            return json_response({'detail': f'Method "{request.method}" not allowed.'}, status=405)
+        request.user = await authenticate(request)
+        if request.user is None:
+            return json_response({'detail': 'Authentication credentials were not provided.'}, status=401)
+        return await view(request, *args, **kwargs)
+    return wrapper
+
+
+@login_required
+async def meal_list(request):
+    request = Request(request)
+    params = request.query_params
+    try:
+        queryset, ordering = search_meals(meal_queryset(params), params)
+    except ValueError as e:
+        return json_response({'error': str(e)}, status=400)
+
+    # Load the ordering columns too: the cursor reads them, and a deferred
+    # field would be fetched synchronously
+    columns = (name.lstrip('-') for name in ordering)
+    queryset = queryset.only(*meal_values(get_fields(params)), *(
+        column for column in columns if column not in queryset.query.annotations
+    ))
+    paginator = KeysetPagination()
+    paginator.ordering = ordering
+    try:
+        meals = await paginator.apaginate_queryset(queryset, request)
+    except NotFound as e:
+        return json_response({'detail': e.detail}, status=404)
+
+    serializer = MealSerializer(meals, many=True, context={
+        'include_reviews': include_reviews(params),
+        'fields': get_fields(params),
+    })
+    return json_response({
+        'next': paginator.get_next_link(),
+        'results': serializer.data,
+    })
+
+
+@login_required
+async def meal_detail(request, pk):
+    params = request.GET
+    try:
+        meal = await meal_queryset(params, detail=True).aget(pk=pk)
+    except Meal.DoesNotExist:
+        return json_response({'detail': 'No Meal matches the given query.'}, status=404)
+    return json_response(MealSerializer(meal, context={
+        'include_reviews': include_reviews(params, default=True),
+        'fields': get_fields(params),
+    }).data)
+
+
+@login_required
+async def cart(request):
+    cart_items = [item async for item in CartItem.objects.filter(user=request.user).with_totals()]
+    serializer = CartItemSerializer(cart_items, many=True, context={'fields': get_fields(request.GET)})
+    return json_response({
+        'items': serializer.data,
+        'total_amount': cart_items[0].cart_total if cart_items else Decimal('0.00'),
+    })
@@ -0,0 +1,94 @@
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import RefreshToken
+
+USER_CLAIMS = ('username', 'email', 'is_active', 'is_admin')
+ACTIVE_USER_KEY = 'auth:user-active:{}'
+
+
+def issue_token(user):
+    """
+    Refresh token carrying the user's identity as claims, so requests made
+    with it (or with access tokens derived from it) skip the user lookup.
+    """
+    refresh = RefreshToken.for_user(user)
+    refresh['username'] = user.username
+    refresh['email'] = user.email
+    refresh['is_active'] = user.is_active
+    refresh['is_admin'] = user.username == 'admin'
+    return refresh
+
+
+def set_user_active(user_id, is_active):
+    """Record a user's current is_active, so their tokens follow it immediately"""
+    cache.set(ACTIVE_USER_KEY.format(user_id), is_active, timeout=settings.AUTH_ACTIVE_CACHE_TIMEOUT)
+
+
+def is_user_active(user_id):
+    """
+    The user's is_active from the database, cached for AUTH_ACTIVE_CACHE_TIMEOUT
+    seconds. A missing entry (expired, evicted or written by another process)
+    costs one query, never a stale answer older than the timeout.
+    """
+    key = ACTIVE_USER_KEY.format(user_id)
+    is_active = cache.get(key)
+    if is_active is None:
+        is_active = User.objects.filter(pk=user_id, is_active=True).exists()
+        cache.set(key, is_active, timeout=settings.AUTH_ACTIVE_CACHE_TIMEOUT)
+    return is_active
+
+
+async def ais_user_active(user_id):
+    key = ACTIVE_USER_KEY.format(user_id)
+    is_active = await cache.aget(key)
+    if is_active is None:
+        is_active = await User.objects.filter(pk=user_id, is_active=True).aexists()
+        await cache.aset(key, is_active, timeout=settings.AUTH_ACTIVE_CACHE_TIMEOUT)
+    return is_active
+
+
+def user_from_claims(validated_token):
+    """
+    Build a User from the token claims without a query, or return None if
+    the token predates the identity claims. The instance is only as fresh as
+    the token and must not be saved.
+    """
+    if api_settings.USER_ID_CLAIM not in validated_token:
+        return None
+    if any(claim not in validated_token for claim in USER_CLAIMS):
+        return None
+
+    user = User(
+        pk=User._meta.pk.to_python(validated_token[api_settings.USER_ID_CLAIM]),
+        username=validated_token['username'],
+        email=validated_token['email'],
+        is_active=validated_token['is_active'],
+    )
+    user._state.adding = False
+    user._state.db = DEFAULT_DB_ALIAS
+    return user
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication that trusts the identity claims added by issue_token()
+    instead of loading the user on every request. Only is_active is checked
+    against the database, through the short-lived cache in is_user_active();
+    toggle_user_status overwrites that entry so it applies at once. Tokens
+    without the claims fall back to the regular database lookup.
+    """
+
+    def get_user(self, validated_token):
+        user = user_from_claims(validated_token)
+        if user is None:
+            return super().get_user(validated_token)
+
+        if not user.is_active or not is_user_active(user.pk):
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        return user
@@ -0,0 +1,79 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+CATALOGUE_VERSION_KEY = 'meals:catalogue-version'
+CACHE_HITS_KEY = 'meals:cache-hits'
+CACHE_MISSES_KEY = 'meals:cache-misses'
+
+
+def get_catalogue_version():
+    version = cache.get(CATALOGUE_VERSION_KEY)
+    if version is None:
+        # Seed from the clock so an evicted version key can never fall back
+        # onto a number that still has stale responses cached under it
+        cache.add(CATALOGUE_VERSION_KEY, time.time_ns(), timeout=None)
+        version = cache.get(CATALOGUE_VERSION_KEY, 0)
+    return version
+
+
+def bump_catalogue_version():
+    """Invalidate every cached meal response by moving to a new version"""
+    try:
+        cache.incr(CATALOGUE_VERSION_KEY)
+    except ValueError:
+        cache.set(CATALOGUE_VERSION_KEY, time.time_ns(), timeout=None)
+
+
+def _increment(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def get_cache_stats():
+    return {
+        'hits': cache.get(CACHE_HITS_KEY, 0),
+        'misses': cache.get(CACHE_MISSES_KEY, 0),
+        'version': get_catalogue_version(),
+    }
+
+
+def catalogue_cache_key(scope, request):
+    url = hashlib.md5(request.build_absolute_uri().encode('utf-8')).hexdigest()
+    return f'meals:v{get_catalogue_version()}:{scope}:{url}'
+
+
+def cached_catalogue_response(request, scope, render):
+    """
+    Serve a rendered meal response from the cache, or call `render()` and
+    cache its JSON body under the current catalogue version.
+
+    Only successful JSON responses are cached; the browsable API and errors
+    always go through `render()`.
+    """
+    renderer = request.accepted_renderer
+    if renderer.format != 'json':
+        return render()
+
+    key = catalogue_cache_key(scope, request)
+    content = cache.get(key)
+    if content is not None:
+        _increment(CACHE_HITS_KEY)
+        response = HttpResponse(content, content_type=renderer.media_type)
+        response['X-Cache'] = 'HIT'
+        return response
+
+    _increment(CACHE_MISSES_KEY)
+    response = render()
+    if response.status_code == 200:
+        # Store the body once DRF has rendered it, so a miss renders only once
+        response.add_post_render_callback(
+            lambda rendered: cache.set(key, rendered.content, timeout=settings.MEAL_CACHE_TIMEOUT)
+        )
+    response['X-Cache'] = 'MISS'
+    return response
@@ -0,0 +1,68 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .models import Meal, CartItem
+
+
+def make_etag(*parts):
+    digest = hashlib.md5(':'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    return quote_etag(digest)
+
+
+# Collections get an ETag only. Their newest updated_at doesn't move when a
+# row is deleted, so a Last-Modified taken from it would let
+# If-Modified-Since answer 304 with a stale list; the row count in the
+# ETag does change.
+
+def meal_list_validators(request):
+    """ETag for the meal list, from one aggregate query"""
+    state = Meal.objects.aggregate(count=Count('id'), last_modified=Max('updated_at'))
+    etag = make_etag(
+        request.get_full_path(), request.accepted_renderer.format,
+        state['count'], state['last_modified'],
+    )
+    return etag, None
+
+
+def meal_detail_validators(request, pk):
+    last_modified = Meal.objects.filter(pk=pk).values_list('updated_at', flat=True).first()
+    if last_modified is None:
+        return None, None
+    etag = make_etag(request.get_full_path(), request.accepted_renderer.format, last_modified)
+    return etag, last_modified
+
+
+def cart_validators(request):
+    """Cart freshness covers the items and the price/title of their meals"""
+    state = CartItem.objects.filter(user=request.user).aggregate(
+        count=Count('id'),
+        items_modified=Max('updated_at'),
+        meals_modified=Max('meal__updated_at'),
+    )
+    etag = make_etag(
+        request.user.pk, request.get_full_path(), request.accepted_renderer.format,
+        state['count'], state['items_modified'], state['meals_modified'],
+    )
+    return etag, None
+
+
+def conditional_response(request, validators, render):
+    """
+    Answer If-None-Match / If-Modified-Since with a 304 before anything is
+    serialized; otherwise call `render()` and attach ETag and Last-Modified.
+    """
+    etag, last_modified = validators
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = render()
+    if response.status_code in (200, 304):
+        if etag:
+            response['ETag'] = etag
+        if timestamp is not None:
+            response['Last-Modified'] = http_date(timestamp)
+    return response
@@ -0,0 +1,74 @@
+import csv
+
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+
+from .models import Meal, Review
+
+EXPORT_CHUNK_SIZE = 2000
+
+# Each export is a flat .values() projection, streamed with .iterator() (or
+# .aiterator() under ASGI) so memory stays constant however large the table is
+EXPORTS = {
+    'users': (User, ('id', 'username', 'email', 'is_active', 'is_staff', 'last_login', 'date_joined')),
+    'reviews': (Review, ('id', 'meal_id', 'user_id', 'rating', 'comment', 'created_at')),
+    'meals': (Meal, ('id', 'title', 'price', 'imageurl', 'rating_sum', 'rating_count', 'created_at', 'updated_at')),
+}
+
+EXPORT_FORMATS = {
+    'ndjson': 'application/x-ndjson',
+    'csv': 'text/csv',
+}
+
+
+class Echo:
+    """File-like object whose write() hands the value back to csv.writer's caller"""
+
+    def write(self, value):
+        return value
+
+
+def ndjson_lines(fields):
+    """(header, row -> line) for NDJSON, which has no header"""
+    encoder = DjangoJSONEncoder()
+    return None, lambda row: encoder.encode(row) + '\n'
+
+
+def csv_lines(fields):
+    writer = csv.writer(Echo())
+    return writer.writerow(fields), lambda row: writer.writerow([row[field] for field in fields])
+
+
+def iter_lines(rows, header, line):
+    if header is not None:
+        yield header
+    for row in rows:
+        yield line(row)
+
+
+async def aiter_lines(rows, header, line):
+    if header is not None:
+        yield header
+    async for row in rows:
+        yield line(row)
+
+
+def export_response(resource, export_format, asynchronous=False):
+    """
+    Stream the export. Under ASGI pass asynchronous=True: Django would read
+    a sync iterator into memory with sync_to_async(list) before sending it,
+    so rows are fetched with aiterator() instead, a chunk at a time.
+    """
+    model, fields = EXPORTS[resource]
+    queryset = model.objects.order_by('id').values(*fields)
+    header, line = csv_lines(fields) if export_format == 'csv' else ndjson_lines(fields)
+
+    if asynchronous:
+        content = aiter_lines(queryset.aiterator(chunk_size=EXPORT_CHUNK_SIZE), header, line)
+    else:
+        content = iter_lines(queryset.iterator(chunk_size=EXPORT_CHUNK_SIZE), header, line)
+
+    response = StreamingHttpResponse(content, content_type=EXPORT_FORMATS[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{resource}.{export_format}"'
+    return response
@@ -0,0 +1,43 @@
+"""
+Sparse fieldsets for the read endpoints.
+
+`?fields=id,title,reviews.rating` names the fields a response should carry,
+with dotted names reaching into nested objects. It is parsed into a tree,
+`{'id': {}, 'title': {}, 'reviews': {'rating': {}}}`, where an empty branch
+keeps the whole field; `None` stands for "no restriction".
+
+`?expand=reviews` (or the older `?include=reviews`) asks for relations that
+are left out by default, currently the reviews on the meal list.
+"""
+
+
+def parse_fields(value):
+    if not value:
+        return None
+    tree = {}
+    for path in value.split(','):
+        node = tree
+        for name in path.strip().split('.'):
+            if name:
+                node = node.setdefault(name, {})
+    return tree or None
+
+
+def get_fields(params):
+    return parse_fields(params.get('fields'))
+
+
+def get_expand(params):
+    names = params.get('expand', '').split(',') + params.get('include', '').split(',')
+    return {name.strip() for name in names if name.strip()}
+
+
+def wants(selection, name):
+    return selection is None or name in selection
+
+
+def branch(selection, name):
+    """The selection for the fields of nested field `name`"""
+    if selection is None:
+        return None
+    return selection.get(name) or None
@@ -0,0 +1,102 @@
+import csv
+import io
+import json
+from itertools import islice
+
+from rest_framework.exceptions import ValidationError
+
+from .cache import bump_catalogue_version
+from .models import Meal
+from .serializers import MealImportSerializer
+
+IMPORT_BATCH_SIZE = 500
+IMPORT_FORMATS = ('csv', 'ndjson', 'json')
+
+
+class ImportInterrupted(ValueError):
+    """
+    The input became unreadable partway through. Batches before the bad
+    spot are already written; `result` counts them.
+    """
+
+    def __init__(self, message, result):
+        super().__init__(message)
+        self.result = result
+
+
+def guess_format(filename):
+    extension = filename.rsplit('.', 1)[-1].lower()
+    if extension == 'jsonl':
+        return 'ndjson'
+    return extension if extension in IMPORT_FORMATS else None
+
+
+def read_rows(stream, import_format):
+    """
+    Yield row dicts from a binary stream. CSV and NDJSON are read line by
+    line; a JSON array has to be parsed whole.
+    """
+    if import_format == 'json':
+        rows = json.load(stream)
+        if not isinstance(rows, list):
+            raise ValueError('JSON input must be an array of meals')
+        yield from rows
+        return
+
+    text = io.TextIOWrapper(stream, encoding='utf-8-sig', newline='')
+    if import_format == 'csv':
+        yield from csv.DictReader(text)
+    else:
+        for line in text:
+            if line.strip():
+                yield json.loads(line)
+
+
+def import_meals(rows, batch_size=IMPORT_BATCH_SIZE):
+    """
+    Validate and upsert meals keyed on external_id, one bulk statement per
+    batch. Invalid rows are skipped and reported by their 1-based position.
+    Each batch commits on its own and bumps the catalogue version, so a
+    read error later in the stream raises ImportInterrupted without leaving
+    cached meal responses stale.
+    """
+    result = {'created': 0, 'updated': 0, 'errors': []}
+    numbered = enumerate(rows, start=1)
+    try:
+        while True:
+            batch = list(islice(numbered, batch_size))
+            if not batch:
+                break
+            _import_batch(batch, result)
+    except (ValueError, csv.Error) as e:
+        raise ImportInterrupted(str(e), result) from e
+    return result
+
+
+def _import_batch(batch, result):
+    serializer = MealImportSerializer()
+    meals = {}
+    for row_number, row in batch:
+        try:
+            data = serializer.run_validation(row)
+        except ValidationError as e:
+            result['errors'].append({'row': row_number, 'errors': e.detail})
+            continue
+        # Within a batch the last row for an external_id wins
+        meals[data['external_id']] = Meal(**data)
+
+    if not meals:
+        return
+
+    existing = set(
+        Meal.objects.filter(external_id__in=list(meals)).values_list('external_id', flat=True)
+    )
+    Meal.objects.bulk_create(
+        list(meals.values()),
+        update_conflicts=True,
+        unique_fields=['external_id'],
+        update_fields=['title', 'price', 'imageurl', 'updated_at'],
+    )
+    bump_catalogue_version()
+    result['updated'] += len(existing)
+    result['created'] += len(meals) - len(existing)
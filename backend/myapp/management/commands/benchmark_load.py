@@ -0,0 +1,90 @@
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp.authentication import issue_token
+from myapp.models import Meal
+
+# The sync DRF endpoints and their async counterparts, so one run against a
+# WSGI server and one against an ASGI server cover the same requests
+PATHS = (
+    '/api/meals/',
+    '/api/meals/{meal}/',
+    '/api/cart/',
+    '/api/async/meals/',
+    '/api/async/meals/{meal}/',
+    '/api/async/cart/',
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Load test a running server: GET each path from concurrent clients and report '
+        'throughput and latency. Run it once against the WSGI application and once against '
+        'the ASGI one, both serving the same database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='*', default=PATHS)
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Server to load')
+        parser.add_argument('--username', default='admin', help='User whose token the clients send')
+        parser.add_argument('--concurrency', type=int, default=16)
+        parser.add_argument('--requests', type=int, default=400, help='Requests per path')
+        parser.add_argument('--warmup', type=int, default=20, help='Untimed requests per path')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f'No user {options["username"]!r}')
+        meal = Meal.objects.order_by('id').values_list('id', flat=True).first()
+        if meal is None:
+            raise CommandError('No meals to request')
+        headers = {'Authorization': f'Bearer {issue_token(user).access_token}'}
+
+        self.stdout.write(
+            f'{options["url"]}: {options["requests"]} requests per path, '
+            f'{options["concurrency"]} concurrent clients'
+        )
+        with ThreadPoolExecutor(options['concurrency']) as pool:
+            for path in options['paths']:
+                url = options['url'].rstrip('/') + path.format(meal=meal)
+                list(pool.map(lambda _: fetch(url, headers), range(options['warmup'])))
+
+                start = time.perf_counter()
+                results = list(pool.map(lambda _: fetch(url, headers), range(options['requests'])))
+                elapsed = time.perf_counter() - start
+
+                timings = sorted(duration for status, duration in results if status == 200)
+                errors = len(results) - len(timings)
+                self.stdout.write(
+                    f'{path:26} {len(results) / elapsed:7.1f} req/s  '
+                    + (
+                        f'median {statistics.median(timings):6.1f}ms  p95 {_p95(timings):6.1f}ms'
+                        if timings else 'no successful responses'
+                    )
+                    + (f'  {errors} errors' if errors else '')
+                )
+
+
+def fetch(url, headers):
+    """GET url, returning the status and the time to read the whole body in ms"""
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=30) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except OSError:
+        status = None
+    return status, (time.perf_counter() - start) * 1000
+
+
+def _p95(values):
+    return values[min(len(values) - 1, round(0.95 * (len(values) - 1)))]
@@ -0,0 +1,106 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import RequestFactory
+from rest_framework.request import Request
+
+from myapp.models import Meal
+from myapp.pagination import KeysetPagination
+from myapp.search import search_meals
+
+STYLES = (
+    'Spicy', 'Grilled', 'Crispy', 'Smoked', 'Garlic', 'Lemon', 'Honey', 'Sweet and Sour', 'BBQ', 'Teriyaki',
+    'Roasted', 'Steamed', 'Fried', 'Braised', 'Tandoori', 'Cajun', 'Pesto', 'Szechuan', 'Herb', 'Creamy',
+)
+MAINS = ('Chicken', 'Beef', 'Pork', 'Tofu', 'Shrimp', 'Salmon', 'Lamb', 'Duck', 'Mushroom', 'Paneer')
+DISHES = (
+    'Curry', 'Salad', 'Soup', 'Noodles', 'Fried Rice', 'Burger', 'Wrap', 'Taco', 'Pizza', 'Pasta',
+    'Bowl', 'Sandwich', 'Skewers', 'Stew', 'Dumplings', 'Ramen', 'Risotto', 'Pie', 'Kebab', 'Platter',
+)
+QUERIES = ('chicken', 'spicy chicken', 'chick', 'tandoori lamb skewers', 'ramen')
+ORDERINGS = ('relevance', '-created_at', 'price')
+
+
+class Command(BaseCommand):
+    help = (
+        'Time GET /api/meals/ searches: the first two pages of each query in each ordering. '
+        'Synthetic meals are added inside a transaction that is rolled back afterwards, '
+        'which holds the write lock for the whole run; use a copy of the database.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('queries', nargs='*', default=QUERIES)
+        parser.add_argument('--meals', type=int, default=100_000, help='Synthetic meals to add (0 uses the table as is)')
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--target-ms', type=float, default=10.0)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['meals']:
+                self.seed(options['meals'])
+            self.stdout.write(f'{Meal.objects.count()} meals')
+            slow = 0
+            for query in options['queries']:
+                for ordering in ORDERINGS:
+                    slow += self.measure(query, ordering, options['repeat'], options['target_ms'])
+            transaction.set_rollback(True)
+
+        summary = f'{slow} searches over the {options["target_ms"]:g}ms target at the median'
+        self.stdout.write(self.style.WARNING(summary) if slow else self.style.SUCCESS(summary))
+
+    def seed(self, count):
+        rng = random.Random(0)
+        start = time.perf_counter()
+        Meal.objects.bulk_create(
+            (
+                Meal(
+                    title=f'{rng.choice(STYLES)} {rng.choice(MAINS)} {rng.choice(DISHES)}',
+                    price=f'{rng.uniform(3, 30):.2f}',
+                    imageurl='https://example.com/meal.png',
+                )
+                for _ in range(count)
+            ),
+            batch_size=2000,
+        )
+        self.stdout.write(f'Added {count} meals in {time.perf_counter() - start:.1f}s')
+
+    def measure(self, query, ordering, repeat, target_ms):
+        factory = RequestFactory(HTTP_HOST='localhost')
+        timings = {1: [], 2: []}
+        matches = None
+        for _ in range(repeat):
+            url = factory.get('/api/meals/', {'q': query, 'ordering': ordering})
+            for page in (1, 2):
+                start = time.perf_counter()
+                queryset, keys = search_meals(Meal.objects.all(), url.GET)
+                paginator = KeysetPagination()
+                paginator.ordering = keys
+                rows = paginator.paginate_queryset(
+                    queryset.values('id', 'title', 'price', *(key.lstrip('-') for key in keys)), Request(url)
+                )
+                timings[page].append((time.perf_counter() - start) * 1000)
+                if page == 1 and matches is None:
+                    matches = len(rows)
+                next_link = paginator.get_next_link()
+                if next_link is None:
+                    break
+                url = factory.get(next_link)
+
+        medians = {page: statistics.median(times) for page, times in timings.items() if times}
+        self.stdout.write(
+            f'{query!r:26} {ordering:12} '
+            + '  '.join(
+                f'page {page}: median {median:.1f}ms p95 {_p95(timings[page]):.1f}ms'
+                for page, median in medians.items()
+            )
+            + f'  ({matches} on page 1)'
+        )
+        return sum(median > target_ms for median in medians.values())
+
+
+def _p95(values):
+    values = sorted(values)
+    return values[min(len(values) - 1, round(0.95 * (len(values) - 1)))]
@@ -0,0 +1,47 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from myapp.importer import IMPORT_BATCH_SIZE, IMPORT_FORMATS, ImportInterrupted, guess_format, import_meals, read_rows
+
+
+class Command(BaseCommand):
+    help = 'Bulk create or update meals from a CSV, NDJSON or JSON file keyed on external_id'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Input file, or '-' for stdin")
+        parser.add_argument('--format', choices=IMPORT_FORMATS, help='Defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        import_format = options['format'] or guess_format(path)
+        if import_format is None:
+            raise CommandError('Cannot tell the input format from the file name; pass --format')
+
+        try:
+            stream = sys.stdin.buffer if path == '-' else open(path, 'rb')
+        except OSError as e:
+            raise CommandError(str(e))
+
+        try:
+            result = import_meals(read_rows(stream, import_format), batch_size=options['batch_size'])
+        except ImportInterrupted as e:
+            self.report_errors(e.result)
+            raise CommandError(
+                f"Could not read input: {e} "
+                f"(created {e.result['created']}, updated {e.result['updated']} before the error)"
+            )
+        finally:
+            if stream is not sys.stdin.buffer:
+                stream.close()
+
+        self.report_errors(result)
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {result['created']}, updated {result['updated']}, "
+            f"skipped {len(result['errors'])} invalid rows"
+        ))
+
+    def report_errors(self, result):
+        for error in result['errors']:
+            self.stderr.write(f"Row {error['row']}: {error['errors']}")
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from myapp.rankings import rebuild_rankings
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the top rated and trending meal rankings from the Review table. '
+        'Run rebuild_rating_counters first if the counters may have drifted.'
+    )
+
+    def handle(self, *args, **options):
+        ranked = rebuild_rankings()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt rankings for {ranked} meals'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from myapp.models import Meal
+
+
+class Command(BaseCommand):
+    help = 'Recompute the denormalized Meal rating counters from the Review table'
+
+    def handle(self, *args, **options):
+        updated = Meal.objects.rebuild_rating_counters()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt rating counters for {updated} meals'))
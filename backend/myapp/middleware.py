@@ -0,0 +1,122 @@
+import heapq
+import logging
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connection
+
+logger = logging.getLogger('myapp.performance')
+
+
+class QueryTimer:
+    """execute_wrapper that counts queries, sums their time and keeps the slowest few"""
+
+    def __init__(self, keep):
+        self.count = 0
+        self.duration = 0.0
+        self.keep = keep
+        self.slowest = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.count += 1
+            self.duration += duration
+            # Min-heap of (duration, order, sql): the root is the first to go
+            entry = (duration, self.count, sql)
+            if len(self.slowest) < self.keep:
+                heapq.heappush(self.slowest, entry)
+            elif self.slowest and duration > self.slowest[0][0]:
+                heapq.heapreplace(self.slowest, entry)
+
+
+class RequestTimingMiddleware:
+    """
+    Measures each request and reports it in a Server-Timing header:
+
+    - db: time spent in SQL on the default database, with the query count
+    - app: from entering the middleware until the response starts rendering
+    - render: DRF/template rendering, for responses rendered lazily
+    - total: wall time inside the middleware
+
+    Requests slower than REQUEST_TIMING_SLOW_MS, or running at least
+    REQUEST_TIMING_QUERY_LIMIT queries, are logged to `myapp.performance`
+    with their slowest queries, except for the views named in
+    REQUEST_TIMING_UNLOGGED_VIEWS. The per-query cost is a couple of clock
+    reads. Under ASGI, async views run their queries in other threads, so
+    only the timings are reported there. Streaming responses are measured
+    up to the first byte.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+
+        start = time.perf_counter()
+        timer = QueryTimer(settings.REQUEST_TIMING_SLOWEST_QUERIES)
+        with connection.execute_wrapper(timer):
+            response = self.get_response(request)
+        self.report(request, response, start, timer)
+        return response
+
+    async def __acall__(self, request):
+        start = time.perf_counter()
+        response = await self.get_response(request)
+        self.report(request, response, start, None)
+        return response
+
+    def process_template_response(self, request, response):
+        # Called right before the handler renders a DRF Response
+        request._timing_render_start = time.perf_counter()
+        return response
+
+    def report(self, request, response, start, timer):
+        end = time.perf_counter()
+        total = (end - start) * 1000
+        render_start = getattr(request, '_timing_render_start', None)
+
+        metrics = []
+        if timer is not None:
+            metrics.append(f'db;dur={timer.duration * 1000:.1f};desc="{timer.count} queries"')
+        if render_start is not None:
+            metrics.append(f'app;dur={(render_start - start) * 1000:.1f}')
+            metrics.append(f'render;dur={(end - render_start) * 1000:.1f}')
+        metrics.append(f'total;dur={total:.1f}')
+        if response.has_header('Server-Timing'):
+            metrics.insert(0, response['Server-Timing'])
+        response['Server-Timing'] = ', '.join(metrics)
+
+        match = getattr(request, 'resolver_match', None)
+        if match is not None and match.url_name in settings.REQUEST_TIMING_UNLOGGED_VIEWS:
+            return
+        query_count = timer.count if timer is not None else 0
+        if total >= settings.REQUEST_TIMING_SLOW_MS or query_count >= settings.REQUEST_TIMING_QUERY_LIMIT:
+            self.log_slow_request(request, response, total, timer)
+
+    def log_slow_request(self, request, response, total, timer):
+        if timer is None:
+            logger.warning('Slow request: %s %s -> %s in %.1fms', request.method,
+                           request.get_full_path(), response.status_code, total)
+            return
+
+        slowest = ''.join(
+            f'\n  {duration * 1000:.1f}ms {sql[:500]}'
+            for duration, _, sql in sorted(timer.slowest, reverse=True)
+        )
+        logger.warning(
+            'Slow request: %s %s -> %s in %.1fms, %d queries in %.1fms; slowest:%s',
+            request.method, request.get_full_path(), response.status_code, total,
+            timer.count, timer.duration * 1000, slowest,
+        )
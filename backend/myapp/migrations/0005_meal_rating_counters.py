@@ -0,0 +1,36 @@
+# Generated by Django 5.1.4 on 2026-10-17 20:08
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def populate_rating_counters(apps, schema_editor):
+    Meal = apps.get_model('myapp', 'Meal')
+    Review = apps.get_model('myapp', 'Review')
+    reviews = Review.objects.filter(meal=OuterRef('pk')).order_by().values('meal')
+    Meal.objects.update(
+        rating_sum=Coalesce(Subquery(reviews.annotate(total=Sum('rating')).values('total')), 0),
+        rating_count=Coalesce(Subquery(reviews.annotate(total=Count('id')).values('total')), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0004_cartitem'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meal',
+            name='rating_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='meal',
+            name='rating_sum',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(populate_rating_counters, migrations.RunPython.noop),
+    ]
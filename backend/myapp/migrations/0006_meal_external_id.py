@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-17 20:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0005_meal_rating_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='meal',
+            name='external_id',
+            field=models.CharField(blank=True, max_length=64, null=True, unique=True),
+        ),
+    ]
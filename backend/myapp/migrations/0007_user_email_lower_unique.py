@@ -0,0 +1,24 @@
+# Generated by Django 5.1.4 on 2026-10-17 20:31
+
+from django.conf import settings
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0006_meal_external_id'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    # auth.User belongs to django.contrib.auth, so the functional index is
+    # added with SQL rather than through Meta.indexes. Blank emails are left
+    # out since any number of users may have none. Signup and signin query
+    # LOWER(email) with the same email <> '' condition so both lookups are
+    # served by it.
+    operations = [
+        migrations.RunSQL(
+            sql="CREATE UNIQUE INDEX myapp_user_email_lower_uniq ON auth_user (LOWER(email)) WHERE email <> ''",
+            reverse_sql='DROP INDEX myapp_user_email_lower_uniq',
+        ),
+    ]
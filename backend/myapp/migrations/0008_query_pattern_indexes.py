@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-17 20:22
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0007_user_email_lower_unique'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cartitem',
+            index=models.Index(fields=['user', '-updated_at'], name='cartitem_user_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['meal', '-created_at', '-id'], name='review_meal_created_idx'),
+        ),
+    ]
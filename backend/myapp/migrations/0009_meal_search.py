@@ -0,0 +1,83 @@
+# Generated by Django 5.1.4 on 2026-10-17 20:36
+
+import django.db.models.deletion
+import myapp.models
+from django.db import migrations, models
+
+# External-content FTS5 table over myapp_meal.title. Triggers rather than
+# post_save/post_delete signals keep it in sync, because bulk_create upserts
+# (the menu import) and queryset updates never send signals. SQLite drops a
+# table's triggers when Django rebuilds it, so a later migration that alters
+# myapp_meal on SQLite has to recreate them.
+SQLITE_CREATE = [
+    "CREATE VIRTUAL TABLE myapp_meal_fts USING fts5("
+    "title, content='myapp_meal', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+    "INSERT INTO myapp_meal_fts(myapp_meal_fts) VALUES ('rebuild')",
+    "CREATE TRIGGER myapp_meal_fts_insert AFTER INSERT ON myapp_meal BEGIN "
+    "INSERT INTO myapp_meal_fts(rowid, title) VALUES (new.id, new.title); END",
+    "CREATE TRIGGER myapp_meal_fts_delete AFTER DELETE ON myapp_meal BEGIN "
+    "INSERT INTO myapp_meal_fts(myapp_meal_fts, rowid, title) VALUES ('delete', old.id, old.title); END",
+    "CREATE TRIGGER myapp_meal_fts_update AFTER UPDATE OF title ON myapp_meal BEGIN "
+    "INSERT INTO myapp_meal_fts(myapp_meal_fts, rowid, title) VALUES ('delete', old.id, old.title); "
+    "INSERT INTO myapp_meal_fts(rowid, title) VALUES (new.id, new.title); END",
+]
+SQLITE_DROP = [
+    'DROP TRIGGER myapp_meal_fts_update',
+    'DROP TRIGGER myapp_meal_fts_delete',
+    'DROP TRIGGER myapp_meal_fts_insert',
+    'DROP TABLE myapp_meal_fts',
+]
+POSTGRES_INDEX = 'meal_title_search_idx'
+
+
+def postgres_search_index():
+    from django.contrib.postgres.indexes import GinIndex
+    from django.contrib.postgres.search import SearchVector
+
+    # Must match the expression myapp.search filters on
+    return GinIndex(SearchVector('title', config='english'), name=POSTGRES_INDEX)
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for sql in SQLITE_CREATE:
+            schema_editor.execute(sql)
+    elif vendor == 'postgresql':
+        schema_editor.add_index(apps.get_model('myapp', 'Meal'), postgres_search_index())
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        for sql in SQLITE_DROP:
+            schema_editor.execute(sql)
+    elif vendor == 'postgresql':
+        schema_editor.remove_index(apps.get_model('myapp', 'Meal'), postgres_search_index())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0008_query_pattern_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MealSearchIndex',
+            fields=[
+                ('meal', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='myapp.meal')),
+                ('title', myapp.models.FullTextField()),
+                ('rank', models.FloatField()),
+            ],
+            options={
+                'db_table': 'myapp_meal_fts',
+                'managed': False,
+            },
+        ),
+        migrations.AddIndex(
+            model_name='meal',
+            index=models.Index(fields=['price'], name='meal_price_idx'),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
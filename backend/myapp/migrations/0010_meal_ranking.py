@@ -0,0 +1,26 @@
+# Generated by Django 5.1.4 on 2026-10-17 20:52
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0009_meal_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MealRanking',
+            fields=[
+                ('meal', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='ranking', serialize=False, to='myapp.meal')),
+                ('bayesian_score', models.FloatField()),
+                ('trending_score', models.FloatField()),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-bayesian_score', '-meal'], name='ranking_bayesian_idx'), models.Index(fields=['-trending_score', '-meal'], name='ranking_trending_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.1.4 on 2026-10-17 22:10
+
+import datetime
+import math
+
+from django.conf import settings
+from django.db import migrations
+
+# Frozen copies of myapp.rankings at the time of this migration
+TRENDING_EPOCH = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def trending_weight(rating, created_at):
+    half_lives = (created_at - TRENDING_EPOCH).total_seconds() / 3600 / settings.RANKING_TRENDING_HALF_LIFE_HOURS
+    return math.log2(rating / 5) + half_lives
+
+
+def log_add(total, weight):
+    high, low = max(total, weight), min(total, weight)
+    if low == -math.inf:
+        return high
+    return high + math.log2(1 + 2 ** (low - high))
+
+
+def to_log_scores(apps, schema_editor):
+    """
+    Recompute every trending score as a log2 sum from the reviews: stored
+    linear scores may already have overflowed with a short half-life.
+    """
+    MealRanking = apps.get_model('myapp', 'MealRanking')
+    Review = apps.get_model('myapp', 'Review')
+
+    trending = {}
+    for meal_id, rating, created_at in Review.objects.order_by().values_list('meal_id', 'rating', 'created_at').iterator():
+        trending[meal_id] = log_add(trending.get(meal_id, -math.inf), trending_weight(rating, created_at))
+
+    for ranking in MealRanking.objects.all().iterator():
+        if ranking.meal_id in trending:
+            ranking.trending_score = trending[ranking.meal_id]
+            ranking.save(update_fields=['trending_score'])
+        else:
+            ranking.delete()
+
+
+def to_linear_scores(apps, schema_editor):
+    MealRanking = apps.get_model('myapp', 'MealRanking')
+    for ranking in MealRanking.objects.all().iterator():
+        try:
+            ranking.trending_score = 2 ** ranking.trending_score
+        except OverflowError:
+            ranking.trending_score = math.inf
+        ranking.save(update_fields=['trending_score'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('myapp', '0010_meal_ranking'),
+    ]
+
+    operations = [
+        migrations.RunPython(to_log_scores, to_linear_scores),
+    ]
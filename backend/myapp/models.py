@@ -1,21 +1,146 @@
-from django.db import models
+from django.db import connections, models
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.contrib.auth.models import User
+from django.db.models.functions import Coalesce, RowNumber
+from django.utils import timezone
 
 # Create your models here.
 
+def average_rating(rating_sum, rating_count):
+    """Mean rating to one decimal place, or 0 for a meal with no reviews"""
+    if not rating_count:
+        return 0
+    return round(rating_sum / rating_count, 1)
+
+class MealQuerySet(models.QuerySet):
+    def adjust_rating_counters(self, rating_delta, count_delta=0):
+        """
+        Atomically shift the denormalized rating counters with F() expressions.
+        Call inside the transaction that writes the review. `updated_at` moves
+        too, since the meal's representation changes with its reviews.
+        """
+        return self.update(
+            rating_sum=models.F('rating_sum') + rating_delta,
+            rating_count=models.F('rating_count') + count_delta,
+            updated_at=timezone.now(),
+        )
+
+    def rebuild_rating_counters(self):
+        """Recompute the rating counters from the Review table in one UPDATE."""
+        reviews = Review.objects.filter(meal=models.OuterRef('pk')).order_by().values('meal')
+        return self.update(
+            rating_sum=Coalesce(
+                models.Subquery(reviews.annotate(total=models.Sum('rating')).values('total')), 0
+            ),
+            rating_count=Coalesce(
+                models.Subquery(reviews.annotate(total=models.Count('id')).values('total')), 0
+            ),
+        )
+
+    def with_reviews(self, limit=None, with_user=True):
+        """
+        Prefetch reviews together with their authors in a single query,
+        keeping only the `limit` most recent reviews per meal if given.
+        `with_user=False` skips the join when authors aren't serialized.
+        """
+        reviews = Review.objects.select_related('user') if with_user else Review.objects.all()
+        if limit is None:
+            return self.prefetch_related(models.Prefetch('reviews', queryset=reviews))
+        # Sliced prefetches can't populate the related manager's cache
+        return self.prefetch_related(
+            models.Prefetch('reviews', queryset=reviews[:limit], to_attr='recent_reviews')
+        )
+
 class Meal(models.Model):
+    # Stable key from the menu source, used by bulk imports to upsert
+    external_id = models.CharField(max_length=64, unique=True, null=True, blank=True)
     title = models.CharField(max_length=200)
     price = models.DecimalField(max_digits=10, decimal_places=2)
     imageurl = models.URLField()
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # Denormalized from Review; kept in step by the review views
+    rating_sum = models.PositiveIntegerField(default=0, editable=False)
+    rating_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = MealQuerySet.as_manager()
 
     def __str__(self):
         return f"{self.title} - ${self.price}"
 
+    @property
+    def average_rating(self):
+        return average_rating(self.rating_sum, self.rating_count)
+
+    @property
+    def embedded_reviews(self):
+        """Reviews limited by MealQuerySet.with_reviews(limit=...), else all of them"""
+        if hasattr(self, 'recent_reviews'):
+            return self.recent_reviews
+        return self.reviews.all()
+
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            # Price range filters and price ordering in search
+            models.Index(fields=['price'], name='meal_price_idx'),
+        ]
+
+@models.CharField.register_lookup
+class NotEqual(models.Lookup):
+    """
+    field__ne=value, rendered as a plain `<>`. exclude() renders
+    NOT (field = value) instead, which SQLite won't match against the WHERE
+    clause of a partial index.
+    """
+    lookup_name = 'ne'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} <> {rhs}', [*lhs_params, *rhs_params]
+
+class FullTextField(models.TextField):
+    """A column of an SQLite FTS5 table, queried with __match"""
+
+@FullTextField.register_lookup
+class FullTextMatch(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', [*lhs_params, *rhs_params]
+
+class MealSearchIndex(models.Model):
+    """
+    The FTS5 index over meal titles on SQLite, maintained by triggers (see
+    migration 0009) so bulk upserts and queryset updates stay in sync too.
+    `rank` is bm25 relevance, lower is better, and is only set in a query
+    that filters on title__match.
+    """
+    meal = models.OneToOneField(
+        Meal, primary_key=True, db_column='rowid', db_constraint=False,
+        on_delete=models.DO_NOTHING, related_name='search_index',
+    )
+    title = FullTextField()
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = 'myapp_meal_fts'
+
+class ReviewQuerySet(models.QuerySet):
+    def latest_per_meal(self, limit):
+        """
+        Keep only the `limit` most recent reviews of each meal, the same rows
+        MealQuerySet.with_reviews(limit=...) prefetches.
+        """
+        return self.annotate(
+            row_number=models.Window(
+                RowNumber(), partition_by=models.F('meal'), order_by=models.F('created_at').desc()
+            )
+        ).filter(row_number__lte=limit)
 
 class Review(models.Model):
     meal = models.ForeignKey(Meal, on_delete=models.CASCADE, related_name='reviews')
@@ -29,12 +154,94 @@ class Review(models.Model):
     comment = models.TextField()
     created_at = models.DateTimeField(auto_now_add=True)
 
+    objects = ReviewQuerySet.as_manager()
+
     def __str__(self):
         return f"Review by {self.user.username} for {self.meal.title}"
 
     class Meta:
         ordering = ['-created_at']
         unique_together = ['meal', 'user']  # One review per meal per user
+        indexes = [
+            # A meal's reviews newest first, with id as the keyset tiebreaker
+            models.Index(fields=['meal', '-created_at', '-id'], name='review_meal_created_idx'),
+        ]
+
+class MealRanking(models.Model):
+    """
+    Precomputed ranking scores for meals that have reviews, kept up to date
+    by the review views through myapp.rankings and rebuilt by the
+    rebuild_meal_rankings command.
+    """
+    meal = models.OneToOneField(Meal, on_delete=models.CASCADE, primary_key=True, related_name='ranking')
+    # Average rating shrunk towards RANKING_PRIOR_RATING for meals with few reviews
+    bayesian_score = models.FloatField()
+    # log2 of the decayed review activity scaled to rankings.TRENDING_EPOCH;
+    # only the order is meaningful until rankings.trending_now() rescales it
+    trending_score = models.FloatField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # GET /api/meals/top/ reads these orders directly
+            models.Index(fields=['-bayesian_score', '-meal'], name='ranking_bayesian_idx'),
+            models.Index(fields=['-trending_score', '-meal'], name='ranking_trending_idx'),
+        ]
+
+class CartItemQuerySet(models.QuerySet):
+    def with_totals(self):
+        """
+        Load each item's meal and compute the line total and the whole cart
+        total in SQL, as Decimals, in the same query.
+        """
+        line_total = models.ExpressionWrapper(
+            models.F('meal__price') * models.F('quantity'),
+            output_field=models.DecimalField(max_digits=12, decimal_places=2),
+        )
+        return self.select_related('meal').annotate(
+            line_total=line_total,
+            cart_total=models.Window(
+                models.Sum(line_total),
+                output_field=models.DecimalField(max_digits=14, decimal_places=2),
+            ),
+        )
+
+    def upsert(self, user, meal, quantity, increment=False):
+        """
+        Insert the (user, meal) line or update it in a single
+        INSERT ... ON CONFLICT statement, so concurrent adds can't race or
+        trip the unique constraint. `increment` adds `quantity` to an
+        existing line instead of replacing it. Returns (item, created).
+
+        Requires ON CONFLICT support (SQLite 3.24+, PostgreSQL).
+        """
+        connection = connections[self.db]
+        quote_name = connection.ops.quote_name
+        opts = self.model._meta
+        table = quote_name(opts.db_table)
+
+        def column(name):
+            return quote_name(opts.get_field(name).column)
+
+        now = timezone.now()
+        db_now = opts.get_field('updated_at').get_db_prep_value(now, connection)
+        if increment:
+            new_quantity = f'{table}.{column("quantity")} + excluded.{column("quantity")}'
+        else:
+            new_quantity = f'excluded.{column("quantity")}'
+
+        sql = (
+            f'INSERT INTO {table} '
+            f'({column("user")}, {column("meal")}, {column("quantity")}, {column("created_at")}, {column("updated_at")}) '
+            f'VALUES (%s, %s, %s, %s, %s) '
+            f'ON CONFLICT ({column("user")}, {column("meal")}) DO UPDATE SET '
+            f'{column("quantity")} = {new_quantity}, {column("updated_at")} = excluded.{column("updated_at")}'
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [getattr(user, 'pk', user), getattr(meal, 'pk', meal), quantity, db_now, db_now])
+
+        item = self.select_related('meal').get(user=user, meal=meal)
+        return item, item.created_at == now
 
 class CartItem(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='cart_items')
@@ -43,9 +250,14 @@ class CartItem(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = CartItemQuerySet.as_manager()
+
     @property
     def total_price(self):
-        return float(self.meal.price) * self.quantity
+        # Prefer the SQL-computed value from CartItemQuerySet.with_totals()
+        if hasattr(self, 'line_total'):
+            return self.line_total
+        return self.meal.price * self.quantity
 
     def __str__(self):
         return f"{self.quantity}x {self.meal.title} for {self.user.username}"
@@ -53,3 +265,7 @@ class CartItem(models.Model):
     class Meta:
         unique_together = ['user', 'meal']
         ordering = ['-updated_at']
+        indexes = [
+            # A user's cart in display order
+            models.Index(fields=['user', '-updated_at'], name='cartitem_user_updated_idx'),
+        ]
@@ -0,0 +1,144 @@
+"""
+Top rated and trending meal rankings, stored in MealRanking.
+
+The Bayesian score blends a meal's reviews with RANKING_PRIOR_WEIGHT
+imaginary reviews of RANKING_PRIOR_RATING, so one 5-star review doesn't
+outrank fifty 4.8s. It only depends on the meal's rating counters.
+
+The trending score sums rating / 5 over the meal's reviews, each halving in
+weight every RANKING_TRENDING_HALF_LIFE_HOURS. Every weight is scaled up to
+TRENDING_EPOCH instead of decayed to "now": all meals share the same decay
+factor, so the stored order is the current order, reviews can be added and
+removed incrementally, and nothing needs periodic refreshing. The scaled
+sums grow exponentially with time, so they are stored as their base-2
+logarithm, which only grows linearly (one per half-life) and never
+overflows. Changing the half-life needs a rebuild.
+"""
+import datetime
+import math
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Meal, MealRanking, Review
+
+TRENDING_EPOCH = datetime.datetime(2026, 1, 1, tzinfo=datetime.timezone.utc)
+REBUILD_BATCH_SIZE = 1000
+
+
+def bayesian_score(rating_sum, rating_count):
+    prior_weight = settings.RANKING_PRIOR_WEIGHT
+    return (prior_weight * settings.RANKING_PRIOR_RATING + rating_sum) / (prior_weight + rating_count)
+
+
+def _half_lives(moment):
+    return (moment - TRENDING_EPOCH).total_seconds() / 3600 / settings.RANKING_TRENDING_HALF_LIFE_HOURS
+
+
+def trending_weight(rating, created_at):
+    """A review's contribution to the stored trending score, as a log2"""
+    return math.log2(rating / 5) + _half_lives(created_at)
+
+
+def trending_now(trending_score, now=None):
+    """Decay a stored trending score to its value at `now`"""
+    return 2 ** (trending_score - _half_lives(now or timezone.now()))
+
+
+def log_add(total, weight):
+    """log2(2**total + 2**weight) without leaving log space"""
+    high, low = max(total, weight), min(total, weight)
+    if low == -math.inf:
+        return high
+    return high + math.log2(1 + 2 ** (low - high))
+
+
+def meal_trending(meal_id):
+    """A meal's trending score summed afresh from its reviews"""
+    total = -math.inf
+    for rating, created_at in Review.objects.filter(meal_id=meal_id).order_by().values_list('rating', 'created_at'):
+        total = log_add(total, trending_weight(rating, created_at))
+    return total
+
+
+def update_ranking(meal_id, added=(), removed=()):
+    """
+    Refresh a meal's Bayesian score from its rating counters and move its
+    trending score by the `added` and `removed` review weights. Call inside
+    the transaction that writes the review, after adjust_rating_counters(),
+    whose row lock serializes concurrent updates to the same meal.
+    """
+    rating_sum, rating_count = Meal.objects.values_list('rating_sum', 'rating_count').get(pk=meal_id)
+    if not rating_count:
+        MealRanking.objects.filter(meal_id=meal_id).delete()
+        return
+
+    ranking = MealRanking.objects.select_for_update().filter(meal_id=meal_id).first()
+    trending = ranking.trending_score if ranking is not None else -math.inf
+    for weight in added:
+        trending = log_add(trending, weight)
+    for weight in removed:
+        # Taking away most of the sum in log space cancels catastrophically
+        # (or exactly), so sum the remaining reviews instead
+        remaining = 1 - 2 ** (weight - trending)
+        if remaining < 0.5:
+            trending = meal_trending(meal_id)
+            break
+        trending += math.log2(remaining)
+
+    score = bayesian_score(rating_sum, rating_count)
+    if ranking is None:
+        MealRanking.objects.create(meal_id=meal_id, bayesian_score=score, trending_score=trending)
+        return
+    ranking.bayesian_score = score
+    ranking.trending_score = trending
+    ranking.save(update_fields=['bayesian_score', 'trending_score', 'updated_at'])
+
+
+def review_added(review):
+    update_ranking(review.meal_id, added=[trending_weight(review.rating, review.created_at)])
+
+
+def review_changed(review, previous_rating):
+    update_ranking(
+        review.meal_id,
+        added=[trending_weight(review.rating, review.created_at)],
+        removed=[trending_weight(previous_rating, review.created_at)],
+    )
+
+
+def review_removed(review):
+    update_ranking(review.meal_id, removed=[trending_weight(review.rating, review.created_at)])
+
+
+def rebuild_rankings():
+    """
+    Recompute every ranking from the Review table and the rating counters;
+    returns the number of ranked meals.
+    """
+    trending = {}
+    reviews = Review.objects.order_by().values_list('meal_id', 'rating', 'created_at')
+    for meal_id, rating, created_at in reviews.iterator(chunk_size=REBUILD_BATCH_SIZE):
+        trending[meal_id] = log_add(trending.get(meal_id, -math.inf), trending_weight(rating, created_at))
+
+    counters = Meal.objects.filter(rating_count__gt=0).values_list('pk', 'rating_sum', 'rating_count')
+    rankings = [
+        MealRanking(
+            meal_id=meal_id,
+            bayesian_score=bayesian_score(rating_sum, rating_count),
+            trending_score=trending[meal_id],
+        )
+        for meal_id, rating_sum, rating_count in counters.iterator(chunk_size=REBUILD_BATCH_SIZE)
+        if meal_id in trending
+    ]
+    with transaction.atomic():
+        MealRanking.objects.filter(meal__rating_count=0).delete()
+        MealRanking.objects.bulk_create(
+            rankings,
+            batch_size=REBUILD_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['meal'],
+            update_fields=['bayesian_score', 'trending_score', 'updated_at'],
+        )
+    return len(rankings)
@@ -0,0 +1,54 @@
+import math
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from rest_framework.renderers import JSONRenderer
+
+
+class ORJSONRenderer(JSONRenderer):
+    """
+    JSONRenderer that encodes with orjson when it is installed.
+
+    The output parses to the same JSON as JSONRenderer's compact output:
+    datetimes and anything else orjson doesn't know are passed to DRF's
+    encoder, and U+2028/U+2029 are escaped the same way. The bytes differ
+    only in float exponents (orjson writes 1e-7 where json writes 1e-07).
+    Indented output, ASCII-only or non-compact settings, and data orjson
+    rejects or would change (non-string keys, integers beyond 64 bits, NaN
+    and infinities, which orjson writes as null) go through JSONRenderer
+    itself, so STRICT_JSON still raises on non-finite floats.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        if orjson is None or self.ensure_ascii or not self.compact:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data,
+                default=self.encoder_class().default,
+                option=orjson.OPT_PASSTHROUGH_DATETIME,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        if b'null' in ret and _has_non_finite(data):
+            return super().render(data, accepted_media_type, renderer_context)
+        return ret.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+
+
+def _has_non_finite(data):
+    """Whether NaN or an infinity is nested anywhere in `data`"""
+    if isinstance(data, float):
+        return not math.isfinite(data)
+    if isinstance(data, dict):
+        return any(_has_non_finite(value) for value in data.values())
+    if isinstance(data, (list, tuple)):
+        return any(_has_non_finite(value) for value in data)
+    return False
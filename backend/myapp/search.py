@@ -0,0 +1,124 @@
+"""
+Search and filters for GET /api/meals/.
+
+?q= matches meal titles word by word, by prefix: through the myapp_meal_fts
+FTS5 table on SQLite and a GIN-indexed tsvector on PostgreSQL (see
+migration 0009). ?min_price= / ?max_price= are served by meal_price_idx and
+?min_rating= compares the (unrounded) average rating. ?ordering= picks one
+of ORDERINGS, each ending in id so it can be keyset paginated; with a
+query the default is relevance, best matches first.
+
+Scoring a match costs more than finding it, and a common word matches a
+large share of the menu, so relevance only ranks the SEARCH_RANKED_MATCHES
+newest matches; the other orderings cover every match and never compute a
+score. `manage.py benchmark_search` times both on a realistic table.
+"""
+import math
+import re
+from decimal import Decimal, InvalidOperation
+
+from django.conf import settings
+from django.db import connections
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+
+# ?ordering= value -> KeysetPagination.ordering. `rank` is lower-is-better
+# relevance and `rating` the average rating, both annotated by search_meals()
+ORDERINGS = {
+    'relevance': ('rank', 'id'),
+    '-created_at': ('-created_at', '-id'),
+    'created_at': ('created_at', 'id'),
+    'price': ('price', 'id'),
+    '-price': ('-price', '-id'),
+    '-average_rating': ('-rating', '-id'),
+}
+
+
+def search_terms(query):
+    return re.findall(r'\w+', query or '')
+
+
+def search_meals(queryset, params):
+    """
+    Apply the search and filter parameters. Returns (queryset, ordering) or
+    raises ValueError with a message for the client.
+    """
+    terms = search_terms(params.get('q'))
+    ordering = params.get('ordering') or ('relevance' if terms else '-created_at')
+    if ordering not in ORDERINGS:
+        raise ValueError('ordering must be one of: ' + ', '.join(ORDERINGS))
+    if ordering == 'relevance' and not terms:
+        raise ValueError('ordering=relevance requires a search query in q')
+
+    if terms:
+        queryset = match_title(queryset, terms, ranked=ordering == 'relevance')
+
+    min_price = _parse_number(params, 'min_price', Decimal)
+    if min_price is not None:
+        queryset = queryset.filter(price__gte=min_price)
+    max_price = _parse_number(params, 'max_price', Decimal)
+    if max_price is not None:
+        queryset = queryset.filter(price__lte=max_price)
+
+    min_rating = _parse_number(params, 'min_rating', float)
+    if min_rating is not None or ordering == '-average_rating':
+        queryset = queryset.annotate(rating=Case(
+            When(rating_count=0, then=Value(0.0)),
+            default=Cast('rating_sum', FloatField()) / F('rating_count'),
+            output_field=FloatField(),
+        ))
+    if min_rating is not None:
+        queryset = queryset.filter(rating__gte=min_rating)
+
+    return queryset, ORDERINGS[ordering]
+
+
+def match_title(queryset, terms, ranked=False):
+    """
+    Meals whose title has a word starting with each term. With `ranked`,
+    only the newest SEARCH_RANKED_MATCHES of them, annotated with `rank`.
+    """
+    vendor = connections[queryset.db].vendor
+    limit = settings.SEARCH_RANKED_MATCHES
+    if vendor == 'sqlite':
+        query = ' '.join(f'"{term}"*' for term in terms)
+        queryset = queryset.filter(search_index__title__match=query)
+        if not ranked:
+            return queryset
+        # FTS5 hands back matches in rowid order for free; cutting them off
+        # there means bm25 only runs on `limit` rows
+        newest = RawSQL(
+            'SELECT rowid FROM myapp_meal_fts WHERE myapp_meal_fts MATCH %s ORDER BY rowid DESC LIMIT %s',
+            (query, limit),
+        )
+        return queryset.filter(id__in=newest).annotate(rank=F('search_index__rank'))
+
+    if vendor == 'postgresql':
+        from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+        vector = SearchVector('title', config='english')
+        query = SearchQuery(' & '.join(f'{term}:*' for term in terms), config='english', search_type='raw')
+        queryset = queryset.annotate(search=vector).filter(search=query)
+        if not ranked:
+            return queryset
+        newest = queryset.order_by('-id').values('id')[:limit]
+        return queryset.filter(id__in=newest).annotate(rank=-SearchRank(vector, query))
+
+    # No full-text index elsewhere; fall back to an unranked substring scan
+    for term in terms:
+        queryset = queryset.filter(title__icontains=term)
+    return queryset.annotate(rank=Value(0.0)) if ranked else queryset
+
+
+def _parse_number(params, name, type_):
+    value = params.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        number = type_(value)
+        if math.isfinite(number):
+            return number
+    except (ValueError, InvalidOperation):
+        pass
+    raise ValueError(f'{name} must be a number')
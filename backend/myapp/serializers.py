@@ -1,12 +1,51 @@
 from rest_framework import serializers
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from django.contrib.auth.models import User
-from .models import Meal, Review, CartItem
+from django.db.models import Q
+from django.db.models.functions import Lower
+from .authentication import issue_token
+from .fieldsets import branch, wants
+from .models import Meal, Review, CartItem, average_rating
 
-class UserSerializer(serializers.ModelSerializer):
+class SparseFieldsMixin:
+    """
+    Limits the output to context['fields'], a selection from
+    fieldsets.parse_fields(). Nested serializers follow their own branch of
+    it by field name, so 'reviews.rating' trims the reviews of a meal.
+    """
+
+    def get_fields(self):
+        fields = super().get_fields()
+        selection = self.context.get('fields')
+        for name in self.field_path():
+            selection = branch(selection, name)
+        if selection is not None:
+            for name in list(fields):
+                if name not in selection:
+                    fields.pop(name)
+        return fields
+
+    def field_path(self):
+        path = []
+        node = self
+        while node.parent is not None:
+            if node.field_name:
+                path.append(node.field_name)
+            node = node.parent
+        return reversed(path)
+
+class UserSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ['id', 'username', 'email', 'is_active']
 
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """/api/token/ issues the same identity claims as signin"""
+
+    @classmethod
+    def get_token(cls, user):
+        return issue_token(user)
+
 class SignUpSerializer(serializers.ModelSerializer):
     email = serializers.EmailField(
         required=True,
@@ -37,15 +76,23 @@ class SignUpSerializer(serializers.ModelSerializer):
         model = User
         fields = ['username', 'email', 'password']
 
-    def validate_email(self, value):
-        if User.objects.filter(email=value).exists():
-            raise serializers.ValidationError('A user with this email already exists')
-        return value
+    def validate(self, attrs):
+        # One indexed query covers both uniqueness checks; the unique
+        # constraints still catch races between this and create_user
+        email = attrs['email'].lower()
+        taken = User.objects.annotate(email_lower=Lower('email')).filter(
+            Q(username=attrs['username']) | Q(email_lower=email, email__ne='')
+        ).values_list('username', 'email_lower')
 
-    def validate_username(self, value):
-        if User.objects.filter(username=value).exists():
-            raise serializers.ValidationError('This username is already taken')
-        return value
+        errors = {}
+        for username, email_lower in taken:
+            if email_lower == email:
+                errors['email'] = ['A user with this email already exists']
+            if username == attrs['username']:
+                errors['username'] = ['This username is already taken']
+        if errors:
+            raise serializers.ValidationError(errors)
+        return attrs
 
     def create(self, validated_data):
         user = User.objects.create_user(
@@ -55,7 +102,7 @@ class SignUpSerializer(serializers.ModelSerializer):
         )
         return user
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(SparseFieldsMixin, serializers.ModelSerializer):
     user = UserSerializer(read_only=True)
     username = serializers.CharField(source='user.username', read_only=True)
     rating = serializers.IntegerField(min_value=1, max_value=5, required=True)
@@ -76,8 +123,8 @@ class ReviewSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError('Comment cannot be empty')
         return value.strip()
 
-class MealSerializer(serializers.ModelSerializer):
-    reviews = ReviewSerializer(many=True, read_only=True)
+class MealSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    reviews = ReviewSerializer(many=True, read_only=True, source='embedded_reviews')
     average_rating = serializers.SerializerMethodField()
     review_count = serializers.SerializerMethodField()
     title = serializers.CharField(required=True)
@@ -89,17 +136,42 @@ class MealSerializer(serializers.ModelSerializer):
         fields = ['id', 'title', 'price', 'imageurl', 'reviews', 'average_rating', 'review_count', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
 
+    def get_fields(self):
+        fields = super().get_fields()
+        # List views leave the nested reviews out unless explicitly requested
+        if not self.context.get('include_reviews', True):
+            fields.pop('reviews', None)
+        return fields
+
     def get_average_rating(self, obj):
-        reviews = obj.reviews.all()
-        if not reviews:
-            return 0
-        return round(sum(review.rating for review in reviews) / len(reviews), 1)
+        return obj.average_rating
 
     def get_review_count(self, obj):
-        return obj.reviews.count()
+        return obj.rating_count
+
+class MealImportSerializer(serializers.ModelSerializer):
+    """One row of a bulk menu import; same field rules as MealSerializer plus external_id"""
+    external_id = serializers.CharField(required=True, max_length=64)
+    title = serializers.CharField(required=True, max_length=200)
+    price = serializers.DecimalField(max_digits=10, decimal_places=2, required=True)
+    imageurl = serializers.URLField(required=True)
+
+    class Meta:
+        model = Meal
+        fields = ['external_id', 'title', 'price', 'imageurl']
+
+class MealSummarySerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    """Meal without its reviews, for embedding in cart items"""
+    average_rating = serializers.ReadOnlyField()
+    review_count = serializers.IntegerField(source='rating_count', read_only=True)
+
+    class Meta:
+        model = Meal
+        fields = ['id', 'title', 'price', 'imageurl', 'average_rating', 'review_count']
+        read_only_fields = fields
 
-class CartItemSerializer(serializers.ModelSerializer):
-    meal = MealSerializer(read_only=True)
+class CartItemSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    meal = MealSummarySerializer(read_only=True)
     meal_id = serializers.IntegerField(write_only=True)
     total_price = serializers.FloatField(read_only=True)
     id = serializers.IntegerField(read_only=True)
@@ -117,26 +189,147 @@ class CartItemSerializer(serializers.ModelSerializer):
     def create(self, validated_data):
         user = self.context['request'].user
         meal_id = validated_data.pop('meal_id')
-        
-        try:
-            meal = Meal.objects.get(id=meal_id)
-        except Meal.DoesNotExist:
+
+        if not Meal.objects.filter(id=meal_id).exists():
             raise serializers.ValidationError({'meal_id': 'Meal not found'})
 
-        # Check if item already exists in cart
-        cart_item = CartItem.objects.filter(user=user, meal=meal).first()
-        if cart_item:
-            cart_item.quantity = validated_data.get('quantity', cart_item.quantity + 1)
-            cart_item.save()
-            return cart_item
-
-        return CartItem.objects.create(
-            user=user,
-            meal=meal,
-            **validated_data
+        # Without an explicit quantity an existing line goes up by one
+        quantity = validated_data.get('quantity')
+        cart_item, created = CartItem.objects.upsert(
+            user,
+            meal_id,
+            quantity or 1,
+            increment=quantity is None
         )
+        return cart_item
 
     def update(self, instance, validated_data):
         instance.quantity = validated_data.get('quantity', instance.quantity)
         instance.save()
         return instance
+
+class CartBatchOperationSerializer(serializers.Serializer):
+    meal_id = serializers.IntegerField()
+    quantity = serializers.IntegerField(
+        min_value=0,
+        error_messages={'min_value': 'Quantity cannot be negative'}
+    )
+
+
+# Read path
+#
+# Plain functions producing exactly what MealSerializer and CartItemSerializer
+# output, built from .values() rows instead of model instances and DRF's
+# per-object field trees. The GET endpoints use these; FlatSerializerTests
+# checks the output against the serializers above byte for byte.
+#
+# Each *_FIELDS table lists (field, columns it needs, render(row, prefix)) in
+# the serializer's field order, so a ?fields= selection decides both the
+# output and which columns are loaded. Nested fields have no renderer; the
+# caller builds them.
+
+_price = serializers.DecimalField(max_digits=10, decimal_places=2)
+_timestamp = serializers.DateTimeField()
+
+MEAL_FIELDS = (
+    ('id', ('id',), lambda row, p: row[p + 'id']),
+    ('title', ('title',), lambda row, p: row[p + 'title']),
+    ('price', ('price',), lambda row, p: _price.to_representation(row[p + 'price'])),
+    ('imageurl', ('imageurl',), lambda row, p: row[p + 'imageurl']),
+    ('reviews', (), None),
+    ('average_rating', ('rating_sum', 'rating_count'),
+     lambda row, p: average_rating(row[p + 'rating_sum'], row[p + 'rating_count'])),
+    ('review_count', ('rating_count',), lambda row, p: row[p + 'rating_count']),
+    ('created_at', ('created_at',), lambda row, p: _timestamp.to_representation(row[p + 'created_at'])),
+    ('updated_at', ('updated_at',), lambda row, p: _timestamp.to_representation(row[p + 'updated_at'])),
+)
+MEAL_SUMMARY_FIELDS = tuple(
+    field for field in MEAL_FIELDS if field[0] in MealSummarySerializer.Meta.fields
+)
+USER_FIELDS = (
+    ('id', ('id',), lambda row, p: row[p + 'id']),
+    ('username', ('username',), lambda row, p: row[p + 'username']),
+    ('email', ('email',), lambda row, p: row[p + 'email']),
+    ('is_active', ('is_active',), lambda row, p: row[p + 'is_active']),
+)
+REVIEW_FIELDS = (
+    ('id', ('id',), lambda row, p: row[p + 'id']),
+    ('user', (), None),
+    ('username', ('user__username',), lambda row, p: row[p + 'user__username']),
+    ('rating', ('rating',), lambda row, p: row[p + 'rating']),
+    ('comment', ('comment',), lambda row, p: row[p + 'comment']),
+    ('created_at', ('created_at',), lambda row, p: _timestamp.to_representation(row[p + 'created_at'])),
+)
+CART_ITEM_FIELDS = (
+    ('id', ('id',), lambda row, p: row[p + 'id']),
+    ('meal', (), None),
+    ('quantity', ('quantity',), lambda row, p: row[p + 'quantity']),
+    ('total_price', ('line_total',), lambda row, p: float(row[p + 'line_total'])),
+)
+
+def field_columns(spec, fields=None, prefix=''):
+    columns = [prefix + column for name, needs, _ in spec if wants(fields, name) for column in needs]
+    return tuple(dict.fromkeys(columns))
+
+def render_fields(spec, row, fields=None, prefix='', nested=None):
+    data = {}
+    for name, _, render in spec:
+        if render is None:
+            if nested and name in nested:
+                data[name] = nested[name]
+        elif wants(fields, name):
+            data[name] = render(row, prefix)
+    return data
+
+def meal_values(fields=None):
+    """Meal columns for `fields`; id and created_at are always loaded for the cursor"""
+    return tuple(dict.fromkeys(('id', 'created_at') + field_columns(MEAL_FIELDS, fields)))
+
+def review_values(fields=None):
+    columns = ('meal_id',) + field_columns(REVIEW_FIELDS, fields)
+    if wants(fields, 'user'):
+        columns += field_columns(USER_FIELDS, branch(fields, 'user'), 'user__')
+    return tuple(dict.fromkeys(columns))
+
+def cart_item_values(fields=None):
+    columns = ('cart_total',) + field_columns(CART_ITEM_FIELDS, fields)
+    if wants(fields, 'meal'):
+        columns += field_columns(MEAL_SUMMARY_FIELDS, branch(fields, 'meal'), 'meal__')
+    return tuple(dict.fromkeys(columns))
+
+MEAL_VALUES = meal_values()
+REVIEW_VALUES = review_values()
+CART_ITEM_VALUES = cart_item_values()
+
+def flat_review(row, fields=None):
+    nested = {}
+    if wants(fields, 'user'):
+        nested['user'] = render_fields(USER_FIELDS, row, branch(fields, 'user'), 'user__')
+    return render_fields(REVIEW_FIELDS, row, fields, nested=nested)
+
+def flat_meals(rows, include_reviews=True, reviews_limit=None, fields=None):
+    """
+    Serialize meal_values() rows, loading the reviews of all of them in one
+    query when they are included, like MealQuerySet.with_reviews().
+    """
+    if not include_reviews:
+        return [render_fields(MEAL_FIELDS, row, fields) for row in rows]
+
+    review_fields = branch(fields, 'reviews')
+    reviews = {row['id']: [] for row in rows}
+    if reviews and reviews_limit != 0:
+        queryset = Review.objects.filter(meal_id__in=reviews)
+        if reviews_limit is not None:
+            queryset = queryset.latest_per_meal(reviews_limit)
+        for review in queryset.values(*review_values(review_fields)):
+            reviews[review['meal_id']].append(flat_review(review, review_fields))
+    return [
+        render_fields(MEAL_FIELDS, row, fields, nested={'reviews': reviews[row['id']]})
+        for row in rows
+    ]
+
+def flat_cart_item(row, fields=None):
+    nested = {}
+    if wants(fields, 'meal'):
+        nested['meal'] = render_fields(MEAL_SUMMARY_FIELDS, row, branch(fields, 'meal'), 'meal__')
+    return render_fields(CART_ITEM_FIELDS, row, fields, nested=nested)
@@ -1,3 +1,1178 @@
-from django.test import TestCase
+import csv
+import importlib
+import json
+import logging
+import os
+import tempfile
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from unittest import mock, skipUnless
+from decimal import Decimal
+from io import BytesIO, StringIO
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, connection
+from django.utils import timezone
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.http import http_date
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from .authentication import issue_token
+from .models import Meal, MealRanking, Review, CartItem
+from .fieldsets import parse_fields
+from .importer import import_meals
+from .parsers import ORJSONParser
+from .renderers import ORJSONRenderer, orjson
+from .serializers import (
+    CART_ITEM_VALUES, MEAL_VALUES, CartItemSerializer, MealSerializer, SignUpSerializer,
+    flat_cart_item, flat_meals,
+)
+from .testing import QueryBudgetMixin
+from .throttling import SigninEmailThrottle, SigninIPThrottle
 
 # Create your tests here.
+
+# Keep slow-request warnings off the test output; assertLogs still captures
+# them where a test asks for them
+quiet_performance_log = mock.patch.object(
+    logging.getLogger('myapp.performance'), 'handlers', [logging.NullHandler()]
+)
+
+
+def setUpModule():
+    quiet_performance_log.start()
+
+
+def tearDownModule():
+    quiet_performance_log.stop()
+
+@override_settings(MEAL_CACHE_TIMEOUT=0)
+class MealListQueryCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'secret123')
+        self.client.force_authenticate(self.user)
+        self.reviewers = [
+            User.objects.create_user(f'reviewer{i}', f'reviewer{i}@example.com', 'secret123')
+            for i in range(3)
+        ]
+
+    def create_meals(self, count):
+        for i in range(count):
+            meal = Meal.objects.create(
+                title=f'Meal {i}',
+                price=Decimal('9.99'),
+                imageurl='https://example.com/meal.png',
+            )
+            for rating, reviewer in enumerate(self.reviewers, start=1):
+                Review.objects.create(meal=meal, user=reviewer, rating=rating, comment='Tasty')
+        Meal.objects.rebuild_rating_counters()
+
+    def test_list_query_count_does_not_grow_with_meals(self):
+        # Freshness aggregate for conditional GET, meals, prefetched reviews
+        url = reverse('meal-list-create') + '?include=reviews'
+        self.create_meals(2)
+        with self.assertNumQueries(3):
+            self.client.get(url)
+
+        self.create_meals(10)
+        with self.assertNumQueries(3):
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), 12)
+
+    def test_list_without_reviews_skips_the_review_query(self):
+        self.create_meals(5)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('meal-list-create'))
+
+        meal = response.data['results'][0]
+        self.assertNotIn('reviews', meal)
+        self.assertEqual(meal['review_count'], 3)
+
+    def test_list_returns_aggregated_review_stats(self):
+        self.create_meals(1)
+        response = self.client.get(reverse('meal-list-create') + '?include=reviews')
+
+        meal = response.data['results'][0]
+        self.assertEqual(meal['review_count'], 3)
+        self.assertEqual(meal['average_rating'], 2.0)
+        self.assertEqual(len(meal['reviews']), 3)
+        self.assertEqual({r['username'] for r in meal['reviews']}, {'reviewer0', 'reviewer1', 'reviewer2'})
+
+    def test_reviews_limit_caps_embedded_reviews(self):
+        self.create_meals(2)
+        response = self.client.get(reverse('meal-list-create') + '?reviews_limit=1')
+
+        for meal in response.data['results']:
+            self.assertEqual(len(meal['reviews']), 1)
+            self.assertEqual(meal['review_count'], 3)
+
+
+class RatingCounterTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user('carol', 'carol@example.com', 'secret123')
+        self.client.force_authenticate(self.user)
+        self.meal = Meal.objects.create(title='Soup', price=Decimal('4.50'), imageurl='https://example.com/soup.png')
+
+    def test_review_endpoints_keep_counters_in_step(self):
+        response = self.client.post(
+            reverse('meal-reviews', args=[self.meal.pk]), {'rating': 4, 'comment': 'Good'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['average_rating'], response.data['review_count']), (4.0, 1))
+        review = Review.objects.get(meal=self.meal)
+
+        response = self.client.put(
+            reverse('update-review', args=[self.meal.pk, review.pk]), {'rating': 2}, format='json'
+        )
+        self.assertEqual((response.data['average_rating'], response.data['review_count']), (2.0, 1))
+        self.meal.refresh_from_db()
+        self.assertEqual((self.meal.rating_sum, self.meal.rating_count), (2, 1))
+
+        response = self.client.delete(reverse('delete-review', args=[self.meal.pk, review.pk]))
+        self.assertEqual((response.data['average_rating'], response.data['review_count']), (0, 0))
+        self.meal.refresh_from_db()
+        self.assertEqual((self.meal.rating_sum, self.meal.rating_count), (0, 0))
+
+    def test_rebuild_command_repairs_drifted_counters(self):
+        Review.objects.create(meal=self.meal, user=self.user, rating=5, comment='Great')
+        Meal.objects.filter(pk=self.meal.pk).update(rating_sum=42, rating_count=7)
+
+        call_command('rebuild_rating_counters', stdout=StringIO())
+
+        self.meal.refresh_from_db()
+        self.assertEqual((self.meal.rating_sum, self.meal.rating_count), (5, 1))
+
+
+@override_settings(MEAL_CACHE_TIMEOUT=0)
+class MealPaginationTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('bob', 'bob@example.com', 'secret123'))
+        self.meals = [
+            Meal.objects.create(title=f'Meal {i}', price=Decimal('5.00'), imageurl='https://example.com/meal.png')
+            for i in range(7)
+        ]
+        # Identical timestamps force the id tiebreaker to do its job
+        Meal.objects.filter(pk__in=[meal.pk for meal in self.meals[2:5]]).update(
+            created_at=self.meals[2].created_at
+        )
+
+    def test_pages_walk_every_meal_once_in_order(self):
+        url = reverse('meal-list-create') + '?page_size=3'
+        seen = []
+        while url:
+            with self.assertNumQueries(2):
+                response = self.client.get(url)
+            self.assertLessEqual(len(response.data['results']), 3)
+            seen.extend(meal['id'] for meal in response.data['results'])
+            url = response.data['next']
+
+        expected = list(
+            Meal.objects.order_by('-created_at', '-id').values_list('id', flat=True)
+        )
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor_returns_404(self):
+        response = self.client.get(reverse('meal-list-create') + '?cursor=not-a-cursor')
+        self.assertEqual(response.status_code, 404)
+
+
+class MealResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.admin = User.objects.create_user('admin', 'admin@example.com', 'secret123')
+        self.client.force_authenticate(self.admin)
+        self.meal = Meal.objects.create(title='Pie', price=Decimal('3.25'), imageurl='https://example.com/pie.png')
+
+    def test_repeated_list_is_served_from_cache(self):
+        url = reverse('meal-list-create')
+        first = self.client.get(url)
+        self.assertEqual(first['X-Cache'], 'MISS')
+
+        # Only the conditional-GET freshness aggregate reaches the database
+        with self.assertNumQueries(1):
+            second = self.client.get(url)
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.content, first.content)
+
+    def test_writes_invalidate_cached_detail(self):
+        url = reverse('meal-detail', args=[self.meal.pk])
+        self.client.get(url)
+
+        self.client.patch(url, {'title': 'Apple pie'}, format='json')
+        response = self.client.get(url)
+
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.json()['title'], 'Apple pie')
+
+    def test_stats_count_hits_and_misses(self):
+        url = reverse('meal-list-create')
+        self.client.get(url)
+        self.client.get(url)
+
+        stats = self.client.get(reverse('meal-cache-stats')).data
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user('dave', 'dave@example.com', 'secret123')
+        self.client.force_authenticate(self.user)
+        self.meal = Meal.objects.create(title='Taco', price=Decimal('2.00'), imageurl='https://example.com/taco.png')
+
+    def test_matching_etag_returns_304(self):
+        for url in [reverse('meal-list-create'), reverse('meal-detail', args=[self.meal.pk]), reverse('get-cart')]:
+            etag = self.client.get(url)['ETag']
+            with self.assertNumQueries(1):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response['ETag'], etag)
+
+        self.assertIn('Last-Modified', self.client.get(reverse('meal-detail', args=[self.meal.pk])))
+
+    def test_deletes_are_not_hidden_by_if_modified_since(self):
+        other = Meal.objects.create(title='Burrito', price=Decimal('3.00'), imageurl='https://example.com/burrito.png')
+        item = CartItem.objects.create(user=self.user, meal=other, quantity=1)
+        since = http_date(time.time() + 60)
+        for url in [reverse('meal-list-create'), reverse('get-cart')]:
+            self.assertNotIn('Last-Modified', self.client.get(url))
+
+        item.delete()
+        other.delete()
+        for url in [reverse('meal-list-create'), reverse('get-cart')]:
+            self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=since).status_code, 200)
+
+    def test_review_changes_the_meal_etag(self):
+        url = reverse('meal-detail', args=[self.meal.pk])
+        etag = self.client.get(url)['ETag']
+
+        self.client.post(reverse('meal-reviews', args=[self.meal.pk]), {'rating': 5, 'comment': 'Yum'}, format='json')
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_cart_etag_follows_cart_changes(self):
+        url = reverse('get-cart')
+        etag = self.client.get(url)['ETag']
+
+        self.client.post(reverse('add-to-cart'), {'meal_id': self.meal.pk, 'quantity': 2}, format='json')
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class CartTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user('erin', 'erin@example.com', 'secret123')
+        self.client.force_authenticate(self.user)
+        self.meals = [
+            Meal.objects.create(title=f'Meal {i}', price=Decimal('0.10'), imageurl='https://example.com/meal.png')
+            for i in range(5)
+        ]
+
+    def test_cart_renders_in_constant_queries_with_sql_totals(self):
+        for meal in self.meals:
+            CartItem.objects.create(user=self.user, meal=meal, quantity=3)
+        Review.objects.create(meal=self.meals[0], user=self.user, rating=5, comment='Nice')
+
+        # Freshness aggregate plus the single cart query
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('get-cart'))
+
+        self.assertEqual(response.data['total_amount'], Decimal('1.50'))
+        item = response.data['items'][0]
+        self.assertEqual(item['total_price'], 0.3)
+        self.assertNotIn('reviews', item['meal'])
+
+    def test_empty_cart(self):
+        response = self.client.get(reverse('get-cart'))
+        self.assertEqual(response.json(), {'items': [], 'total_amount': 0.0})
+
+    def test_batch_applies_every_operation_in_one_request(self):
+        CartItem.objects.create(user=self.user, meal=self.meals[0], quantity=1)
+        CartItem.objects.create(user=self.user, meal=self.meals[1], quantity=1)
+
+        response = self.client.post(reverse('batch-update-cart'), {'operations': [
+            {'meal_id': self.meals[0].pk, 'quantity': 4},
+            {'meal_id': self.meals[1].pk, 'quantity': 0},
+            {'meal_id': self.meals[2].pk, 'quantity': 2},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        quantities = dict(CartItem.objects.filter(user=self.user).values_list('meal_id', 'quantity'))
+        self.assertEqual(quantities, {self.meals[0].pk: 4, self.meals[2].pk: 2})
+        self.assertEqual(response.data['total_amount'], Decimal('0.60'))
+
+    def test_batch_with_unknown_meal_changes_nothing(self):
+        response = self.client.post(reverse('batch-update-cart'), {'operations': [
+            {'meal_id': self.meals[0].pk, 'quantity': 1},
+            {'meal_id': 9999, 'quantity': 1},
+        ]}, format='json')
+
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.data['meal_ids'], [9999])
+        self.assertFalse(CartItem.objects.exists())
+
+
+class ConcurrentCartUpsertTests(TransactionTestCase):
+    workers = 8
+    adds_per_meal = 40
+
+    def setUp(self):
+        self.user = User.objects.create_user('frank', 'frank@example.com', 'secret123')
+        self.meals = [
+            Meal.objects.create(title=f'Meal {i}', price=Decimal('1.00'), imageurl='https://example.com/meal.png')
+            for i in range(3)
+        ]
+
+    def add(self, meal, increment):
+        try:
+            if connection.vendor == 'sqlite':
+                # Wait out the writer lock however loaded the machine is,
+                # independently of the project's busy timeout setting
+                with connection.cursor() as cursor:
+                    cursor.execute('PRAGMA busy_timeout = 60000')
+            return CartItem.objects.upsert(self.user, meal, 1, increment=increment)[0].pk
+        finally:
+            connection.close()
+
+    def run_parallel(self, increment):
+        calls = [meal for meal in self.meals for _ in range(self.adds_per_meal)]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            return list(pool.map(lambda meal: self.add(meal, increment), calls))
+
+    def test_parallel_increments_are_not_lost(self):
+        self.run_parallel(increment=True)
+
+        quantities = dict(CartItem.objects.filter(user=self.user).values_list('meal_id', 'quantity'))
+        self.assertEqual(quantities, {meal.pk: self.adds_per_meal for meal in self.meals})
+
+    def test_parallel_sets_leave_one_line_per_meal(self):
+        self.run_parallel(increment=False)
+
+        quantities = dict(CartItem.objects.filter(user=self.user).values_list('meal_id', 'quantity'))
+        self.assertEqual(quantities, {meal.pk: 1 for meal in self.meals})
+
+
+class ListUsersTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('admin', 'admin@example.com', 'secret123'))
+        meal = Meal.objects.create(title='Stew', price=Decimal('6.00'), imageurl='https://example.com/stew.png')
+        self.users = [User.objects.create_user(f'user{i}', f'user{i}@example.com', 'x') for i in range(5)]
+        for user in self.users[:2]:
+            Review.objects.create(meal=meal, user=user, rating=4, comment='Fine')
+        self.users[4].is_active = False
+        self.users[4].save()
+
+    def test_pages_cost_one_query_each(self):
+        url = reverse('list-users') + '?page_size=2'
+        rows = []
+        while url:
+            with self.assertNumQueries(1):
+                response = self.client.get(url)
+            rows.extend(response.data['results'])
+            url = response.data['next']
+
+        self.assertEqual([row['username'] for row in rows], [f'user{i}' for i in range(5)])
+        self.assertEqual([row['review_count'] for row in rows], [1, 1, 0, 0, 0])
+
+    def test_filters(self):
+        url = reverse('list-users')
+        active = self.client.get(url + '?is_active=false').data['results']
+        self.assertEqual([row['username'] for row in active], ['user4'])
+
+        reviewed = self.client.get(url + '?has_reviews=true').data['results']
+        self.assertEqual([row['username'] for row in reviewed], ['user0', 'user1'])
+
+        self.assertEqual(self.client.get(url + '?joined_after=3000-01-01').data['results'], [])
+        self.assertEqual(self.client.get(url + '?joined_after=soon').status_code, 400)
+
+
+class ExportTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin = User.objects.create_user('admin', 'admin@example.com', 'secret123')
+        self.client.force_authenticate(self.admin)
+        self.meal = Meal.objects.create(title='Curry, hot', price=Decimal('8.50'), imageurl='https://example.com/curry.png')
+        Review.objects.create(meal=self.meal, user=self.admin, rating=5, comment='Spicy')
+
+    def read(self, response):
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_ndjson_export(self):
+        response = self.client.get(reverse('export-data', args=['reviews']))
+
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        rows = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual([(row['meal_id'], row['rating']) for row in rows], [(self.meal.pk, 5)])
+
+    def test_csv_export(self):
+        response = self.client.get(reverse('export-data', args=['meals']) + '?output=csv')
+
+        rows = list(csv.reader(self.read(response).splitlines()))
+        self.assertEqual(rows[0][:3], ['id', 'title', 'price'])
+        self.assertEqual(rows[1][1:3], ['Curry, hot', '8.50'])
+
+    async def test_asgi_export_streams_an_async_iterator(self):
+        token = (await sync_to_async(issue_token)(self.admin)).access_token
+        response = await self.async_client.get(
+            reverse('export-data', args=['meals']) + '?output=csv', headers={'Authorization': f'Bearer {token}'}
+        )
+
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content]).decode('utf-8')
+        self.assertEqual(list(csv.reader(content.splitlines()))[1][1:3], ['Curry, hot', '8.50'])
+
+    def test_export_is_admin_only(self):
+        self.client.force_authenticate(User.objects.create_user('mallory', 'm@example.com', 'x'))
+        self.assertEqual(self.client.get(reverse('export-data', args=['users'])).status_code, 403)
+
+
+class MealImportTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('admin', 'admin@example.com', 'secret123'))
+        Meal.objects.create(external_id='m-1', title='Old', price=Decimal('1.00'), imageurl='https://example.com/1.png')
+
+    def test_endpoint_upserts_and_reports_row_errors(self):
+        response = self.client.post(reverse('meal-bulk-import'), [
+            {'external_id': 'm-1', 'title': 'Renamed', 'price': '2.00', 'imageurl': 'https://example.com/1.png'},
+            {'external_id': 'm-2', 'title': 'New', 'price': '3.00', 'imageurl': 'https://example.com/2.png'},
+            {'external_id': 'm-3', 'title': 'Broken', 'price': 'free', 'imageurl': 'not a url'},
+        ], format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['created'], response.data['updated']), (1, 1))
+        self.assertEqual([error['row'] for error in response.data['errors']], [3])
+        self.assertEqual(
+            dict(Meal.objects.values_list('external_id', 'title')),
+            {'m-1': 'Renamed', 'm-2': 'New'},
+        )
+
+    def test_command_streams_csv_in_batches(self):
+        rows = ['external_id,title,price,imageurl'] + [
+            f'c-{i},Meal {i},{i}.50,https://example.com/{i}.png' for i in range(5)
+        ]
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as handle:
+            handle.write('\n'.join(rows))
+        self.addCleanup(os.remove, handle.name)
+
+        out = StringIO()
+        call_command('import_meals', handle.name, '--batch-size', '2', stdout=out)
+
+        self.assertIn('Created 5, updated 0', out.getvalue())
+        self.assertEqual(Meal.objects.get(external_id='c-3').price, Decimal('3.50'))
+
+    def test_read_error_midway_keeps_earlier_batches_and_invalidates_the_cache(self):
+        self.assertEqual(self.client.get(reverse('meal-list-create'))['X-Cache'], 'MISS')
+        lines = [
+            json.dumps({'external_id': f'n-{i}', 'title': f'Meal {i}', 'price': '4.00',
+                        'imageurl': 'https://example.com/n.png'})
+            for i in range(2)
+        ] + ['{not json']
+        with tempfile.NamedTemporaryFile('w', suffix='.ndjson', delete=False) as handle:
+            handle.write('\n'.join(lines))
+        self.addCleanup(os.remove, handle.name)
+
+        with self.assertRaisesMessage(CommandError, 'created 2, updated 0 before the error'):
+            call_command('import_meals', handle.name, '--batch-size', '2', stdout=StringIO(), stderr=StringIO())
+
+        response = self.client.get(reverse('meal-list-create'))
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.data['results']), 3)
+
+    def test_endpoint_reports_counts_on_unreadable_input(self):
+        upload = SimpleUploadedFile('meals.csv', b'external_id,title,price,imageurl\n\xff\xfe,x,1,y\n')
+        response = self.client.post(reverse('meal-bulk-import'), {'file': upload})
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('Could not read input', response.data['error'])
+        self.assertEqual((response.data['created'], response.data['updated']), (0, 0))
+
+
+class AsyncReadEndpointTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('gina', 'gina@example.com', 'secret123')
+        self.meal = Meal.objects.create(title='Ramen', price=Decimal('7.00'), imageurl='https://example.com/ramen.png')
+        CartItem.objects.create(user=self.user, meal=self.meal, quantity=2)
+        token = RefreshToken.for_user(self.user).access_token
+        self.headers = {'Authorization': f'Bearer {token}'}
+        self.sync_client = APIClient()
+        self.sync_client.credentials(HTTP_AUTHORIZATION=self.headers['Authorization'])
+
+    async def test_async_endpoints_match_sync_responses(self):
+        pairs = [
+            (reverse('async-meal-list') + '?include=reviews', reverse('meal-list-create') + '?include=reviews'),
+            (reverse('async-meal-list') + '?q=ram&fields=id,title&ordering=price',
+             reverse('meal-list-create') + '?q=ram&fields=id,title&ordering=price'),
+            (reverse('async-meal-detail', args=[self.meal.pk]), reverse('meal-detail', args=[self.meal.pk])),
+            (reverse('async-cart'), reverse('get-cart')),
+        ]
+        for async_url, sync_url in pairs:
+            response = await self.async_client.get(async_url, headers=self.headers)
+            self.assertEqual(response.status_code, 200)
+            expected = await sync_to_async(self.sync_client.get)(sync_url)
+            self.assertEqual(response.json(), expected.json())
+
+    async def test_async_list_searches_like_the_sync_list(self):
+        await Meal.objects.acreate(title='Chicken Katsu', price=Decimal('9.00'), imageurl='https://example.com/katsu.png')
+        response = await self.async_client.get(reverse('async-meal-list') + '?q=chicken', headers=self.headers)
+        self.assertEqual([meal['title'] for meal in response.json()['results']], ['Chicken Katsu'])
+
+        response = await self.async_client.get(reverse('async-meal-list') + '?ordering=rank', headers=self.headers)
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('ordering must be one of', response.json()['error'])
+
+    async def test_async_endpoints_require_a_token(self):
+        response = await self.async_client.get(reverse('async-cart'))
+        self.assertEqual(response.status_code, 401)
+
+
+class ClaimsAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.admin = User.objects.create_user('admin', 'admin@example.com', 'secret123')
+        self.user = User.objects.create_user('hank', 'hank@example.com', 'secret123')
+
+    def sign_in(self, email):
+        response = self.client.post(reverse('signin'), {'email': email, 'password': 'secret123'}, format='json')
+        return {'HTTP_AUTHORIZATION': f"Bearer {response.data['token']}"}
+
+    def test_signin_token_authenticates_without_a_user_query(self):
+        headers = self.sign_in('admin@example.com')
+        self.client.get(reverse('meal-cache-stats'), **headers)
+
+        # is_active is now cached, so the claims are all that's needed
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('meal-cache-stats'), **headers)
+        self.assertEqual(response.status_code, 200)
+
+    def test_deactivation_revokes_outstanding_tokens(self):
+        admin_headers = self.sign_in('admin@example.com')
+        user_headers = self.sign_in('hank@example.com')
+        self.assertEqual(self.client.get(reverse('get-cart'), **user_headers).status_code, 200)
+
+        self.client.post(reverse('toggle-user-status', args=[self.user.pk]), **admin_headers)
+        self.assertEqual(self.client.get(reverse('get-cart'), **user_headers).status_code, 401)
+
+        self.client.post(reverse('toggle-user-status', args=[self.user.pk]), **admin_headers)
+        self.assertEqual(self.client.get(reverse('get-cart'), **user_headers).status_code, 200)
+
+    def test_deactivation_survives_cache_eviction(self):
+        admin_headers = self.sign_in('admin@example.com')
+        user_headers = self.sign_in('hank@example.com')
+        self.client.post(reverse('toggle-user-status', args=[self.user.pk]), **admin_headers)
+
+        cache.clear()
+        self.assertEqual(self.client.get(reverse('get-cart'), **user_headers).status_code, 401)
+
+    def test_deactivation_outside_the_api_applies_once_the_entry_expires(self):
+        user_headers = self.sign_in('hank@example.com')
+        self.assertEqual(self.client.get(reverse('get-cart'), **user_headers).status_code, 200)
+
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        cache.clear()
+        self.assertEqual(self.client.get(reverse('get-cart'), **user_headers).status_code, 401)
+
+    async def test_async_endpoints_check_is_active(self):
+        user_headers = await sync_to_async(self.sign_in)('hank@example.com')
+        headers = {'Authorization': user_headers['HTTP_AUTHORIZATION']}
+        response = await self.async_client.get(reverse('async-cart'), headers=headers)
+        self.assertEqual(response.status_code, 200)
+
+        await User.objects.filter(pk=self.user.pk).aupdate(is_active=False)
+        await cache.aclear()
+        response = await self.async_client.get(reverse('async-cart'), headers=headers)
+        self.assertEqual(response.status_code, 401)
+
+    def test_tokens_without_claims_fall_back_to_the_database(self):
+        token = RefreshToken.for_user(self.user).access_token
+        response = self.client.get(reverse('get-cart'), HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.assertEqual(response.status_code, 200)
+
+
+class SigninCostTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user('ivy', 'ivy@example.com', 'secret123')
+
+    def sign_in(self, password='secret123', email='ivy@example.com'):
+        return self.client.post(reverse('signin'), {'email': email, 'password': password}, format='json')
+
+    def test_email_bucket_rejects_before_hashing(self):
+        with mock.patch.object(SigninEmailThrottle, 'rate', '2/min', create=True), \
+                mock.patch.object(User, 'check_password', autospec=True, return_value=False) as check_password:
+            statuses = [self.sign_in('wrong').status_code for _ in range(3)]
+
+        self.assertEqual(statuses, [401, 401, 429])
+        self.assertEqual(check_password.call_count, 2)
+
+    def test_ip_bucket_ignores_spoofed_forwarded_for(self):
+        with mock.patch.object(SigninIPThrottle, 'rate', '2/min', create=True):
+            statuses = [
+                self.client.post(
+                    reverse('signin'), {'email': f'guess{i}@example.com', 'password': 'x'},
+                    format='json', HTTP_X_FORWARDED_FOR=f'203.0.113.{i}',
+                ).status_code
+                for i in range(3)
+            ]
+        self.assertEqual(statuses, [401, 401, 429])
+
+    def test_login_rehashes_when_iterations_change(self):
+        with override_settings(PASSWORD_HASH_ITERATIONS=1000):
+            self.assertEqual(self.sign_in().status_code, 200)
+
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('pbkdf2_sha256$1000$'))
+
+
+class EmailLookupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        User.objects.create_user('jack', 'Jack@Example.com', 'secret123')
+
+    def test_signin_matches_email_case_insensitively_through_the_index(self):
+        response = self.client.post(
+            reverse('signin'), {'email': 'jack@example.COM', 'password': 'secret123'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.client.post(reverse('signin'), {'email': 'JACK@example.com', 'password': 'secret123'}, format='json')
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + queries[0]['sql'])
+            plan = str(cursor.fetchall())
+        self.assertIn('myapp_user_email_lower_uniq', plan)
+
+    def test_signup_lookup_uses_the_index(self):
+        serializer = SignUpSerializer(data={'username': 'kim', 'email': 'kim@example.com', 'password': 'secret123'})
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(serializer.is_valid())
+        with connection.cursor() as cursor:
+            cursor.execute('EXPLAIN QUERY PLAN ' + queries[0]['sql'])
+            plan = str(cursor.fetchall())
+        self.assertIn('myapp_user_email_lower_uniq', plan)
+
+    def test_signin_rejects_non_string_credentials(self):
+        for body in ({'email': 5, 'password': 'secret123'}, {'email': ['jack@example.com'], 'password': 'secret123'},
+                     {'email': 'jack@example.com', 'password': {'p': 1}}):
+            response = self.client.post(reverse('signin'), body, format='json')
+            self.assertEqual(response.status_code, 400)
+
+    def test_signup_checks_uniqueness_in_one_query(self):
+        serializer = SignUpSerializer(data={'username': 'jack', 'email': 'JACK@example.com', 'password': 'secret123'})
+        with self.assertNumQueries(1):
+            self.assertFalse(serializer.is_valid())
+        self.assertEqual(set(serializer.errors), {'username', 'email'})
+
+    def test_database_rejects_case_variant_duplicates(self):
+        with self.assertRaises(IntegrityError):
+            User.objects.create_user('jill', 'JACK@EXAMPLE.COM', 'secret123')
+
+    def test_any_number_of_users_may_have_no_email(self):
+        User.objects.create_user('a')
+        User.objects.create_user('b')
+        User.objects.create_superuser('c', '', 'x')
+        self.assertEqual(User.objects.filter(email='').count(), 3)
+
+
+class QueryPlanTests(TestCase):
+    """The hot list queries should be answered straight from an index, without a sort step"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('kim', 'kim@example.com', 'secret123')
+        self.meal = Meal.objects.create(title='Salad', price=Decimal('5.50'), imageurl='https://example.com/salad.png')
+
+    def assertUsesIndex(self, queryset, index_name):
+        plan = queryset.explain()
+        self.assertIn(index_name, plan)
+        if connection.vendor == 'sqlite':
+            self.assertNotIn('TEMP B-TREE', plan)
+
+    def test_cart_items_by_user_in_display_order(self):
+        self.assertUsesIndex(CartItem.objects.filter(user=self.user), 'cartitem_user_updated_idx')
+
+    def test_meals_by_price(self):
+        self.assertUsesIndex(Meal.objects.filter(price__gte=Decimal('5')).order_by('price', 'id'), 'meal_price_idx')
+
+    def test_top_rated_meals(self):
+        self.assertUsesIndex(MealRanking.objects.order_by('-bayesian_score', '-meal_id'), 'ranking_bayesian_idx')
+
+    def test_reviews_by_meal_newest_first(self):
+        self.assertUsesIndex(
+            Review.objects.filter(meal=self.meal).order_by('-created_at', '-id'), 'review_meal_created_idx'
+        )
+
+
+class SQLiteConnectionTests(TestCase):
+    """New SQLite connections are switched to WAL with a relaxed fsync policy"""
+
+    def test_pragmas_applied_on_connect(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest('SQLite only')
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            self.assertEqual(cursor.fetchone()[0], 'wal')
+            cursor.execute('PRAGMA synchronous')
+            self.assertEqual(cursor.fetchone()[0], 1)
+            cursor.execute('PRAGMA busy_timeout')
+            self.assertEqual(cursor.fetchone()[0], 5000)
+
+
+class ProductionSettingsTests(TestCase):
+    """The prod profile serves the API through a minimal, JSON-only stack"""
+
+    def test_prod_profile(self):
+        with mock.patch.dict(os.environ, {'DJANGO_SECRET_KEY': 'prod-secret'}):
+            prod = importlib.import_module('backend2.settings.prod')
+        self.assertFalse(prod.DEBUG)
+        self.assertNotIn('django.contrib.sessions.middleware.SessionMiddleware', prod.MIDDLEWARE)
+        self.assertNotIn('django.middleware.csrf.CsrfViewMiddleware', prod.MIDDLEWARE)
+        self.assertEqual(
+            prod.REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'], ['myapp.renderers.ORJSONRenderer']
+        )
+
+
+class JSONCodecTests(TestCase):
+    """ORJSONRenderer/ORJSONParser must be drop-ins for DRF's JSON classes"""
+
+    def setUp(self):
+        self.data = {
+            'title': 'Crème brûlée \u2028\u2029',
+            'price': Decimal('12.50'),
+            'created_at': timezone.now(),
+            'day': timezone.now().date(),
+            'id': uuid.uuid4(),
+            'ratings': (5, 4.5, None, True),
+            'huge': 2 ** 70,
+        }
+
+    def test_render_matches_json_renderer(self):
+        expected = JSONRenderer().render(self.data)
+        self.assertEqual(ORJSONRenderer().render(self.data), expected)
+        del self.data['huge']
+        self.assertEqual(ORJSONRenderer().render(self.data), JSONRenderer().render(self.data))
+        self.assertEqual(
+            ORJSONRenderer().render(self.data, 'application/json; indent=2'),
+            JSONRenderer().render(self.data, 'application/json; indent=2'),
+        )
+
+    @skipUnless(orjson, 'orjson is not installed')
+    def test_render_uses_orjson(self):
+        del self.data['huge']
+        with mock.patch.object(JSONRenderer, 'render', side_effect=AssertionError('fell back')):
+            content = ORJSONRenderer().render(self.data)
+        self.assertEqual(content, JSONRenderer().render(self.data))
+
+    @skipUnless(orjson, 'orjson is not installed')
+    def test_render_float_edge_cases(self):
+        # Exponents are formatted differently but parse to the same value
+        data = {'small': 1e-07, 'large': 1e22, 'negative': -0.0}
+        self.assertEqual(json.loads(ORJSONRenderer().render(data)), data)
+
+        for value in (float('nan'), float('inf'), float('-inf')):
+            data = {'ratings': [{'score': value}], 'note': None}
+            with self.assertRaises(ValueError):
+                JSONRenderer().render(data)
+            with self.assertRaises(ValueError):
+                ORJSONRenderer().render(data)
+            # Without STRICT_JSON the value is kept, as JSONRenderer does, not nulled
+            renderer = ORJSONRenderer()
+            renderer.strict = False
+            self.assertNotIn(b'"score":null', renderer.render(data))
+
+    def test_parse_matches_json_parser(self):
+        for body in (b'{"a": [1, 2.5, "\xc3\xa9"], "b": null}', b'[123456789012345678901234567890]'):
+            self.assertEqual(ORJSONParser().parse(BytesIO(body)), JSONParser().parse(BytesIO(body)))
+        with self.assertRaises(ParseError):
+            ORJSONParser().parse(BytesIO(b'{"price": NaN}'))
+
+
+class FlatSerializerTests(TestCase):
+    """The .values() read path must render to the same bytes as the DRF serializers"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('lee', 'lee@example.com', 'secret123')
+        other = User.objects.create_user('max', 'max@example.com', 'secret123', is_active=False)
+        self.meals = [
+            Meal.objects.create(title='Crème brûlée', price=Decimal('7'), imageurl='https://example.com/creme.png'),
+            Meal.objects.create(title='Soup', price=Decimal('4.05'), imageurl='https://example.com/soup.png'),
+            Meal.objects.create(title='Tea', price=Decimal('1.10'), imageurl='https://example.com/tea.png'),
+        ]
+        for meal in self.meals[:2]:
+            for author, rating in ((self.user, 5), (other, 2)):
+                Review.objects.create(meal=meal, user=author, rating=rating, comment=f'{rating} stars “quoted”')
+        Meal.objects.rebuild_rating_counters()
+        CartItem.objects.create(user=self.user, meal=self.meals[0], quantity=3)
+        CartItem.objects.create(user=self.user, meal=self.meals[2], quantity=1)
+
+    def assertSameBytes(self, expected, actual):
+        self.assertEqual(JSONRenderer().render(actual), JSONRenderer().render(expected))
+
+    def test_meals_with_reviews(self):
+        expected = MealSerializer(Meal.objects.with_reviews(), many=True).data
+        self.assertSameBytes(expected, flat_meals(Meal.objects.values(*MEAL_VALUES)))
+
+    def test_meals_with_recent_reviews(self):
+        expected = MealSerializer(Meal.objects.with_reviews(limit=1), many=True).data
+        self.assertSameBytes(expected, flat_meals(Meal.objects.values(*MEAL_VALUES), reviews_limit=1))
+
+    def test_meals_without_reviews(self):
+        expected = MealSerializer(Meal.objects.all(), many=True, context={'include_reviews': False}).data
+        self.assertSameBytes(expected, flat_meals(Meal.objects.values(*MEAL_VALUES), include_reviews=False))
+
+    def test_cart_items(self):
+        cart = CartItem.objects.filter(user=self.user).with_totals()
+        expected = CartItemSerializer(cart, many=True).data
+        self.assertSameBytes(expected, [flat_cart_item(row) for row in cart.values(*CART_ITEM_VALUES)])
+
+
+@override_settings(MEAL_CACHE_TIMEOUT=0)
+class SparseFieldsetTests(TestCase):
+    """?fields= trims the output and the columns and relations that get loaded"""
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user('nia', 'nia@example.com', 'secret123')
+        self.client.force_authenticate(self.user)
+        self.meal = Meal.objects.create(title='Curry', price=Decimal('8.00'), imageurl='https://example.com/curry.png')
+        Review.objects.create(meal=self.meal, user=self.user, rating=4, comment='Spicy')
+        Meal.objects.rebuild_rating_counters()
+
+    def test_list_fields_drop_reviews_even_when_expanded(self):
+        url = reverse('meal-list-create') + '?fields=id,title,price,imageurl,average_rating&expand=reviews'
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(
+            list(response.data['results'][0]), ['id', 'title', 'price', 'imageurl', 'average_rating']
+        )
+
+    def test_expand_embeds_reviews(self):
+        response = self.client.get(reverse('meal-list-create') + '?expand=reviews')
+        self.assertEqual(len(response.data['results'][0]['reviews']), 1)
+
+    def test_nested_review_fields_skip_the_user_join(self):
+        url = reverse('meal-detail', args=[self.meal.pk]) + '?fields=id,reviews.rating'
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.data, {'id': self.meal.pk, 'reviews': [{'rating': 4}]})
+        self.assertFalse(any('auth_user' in query['sql'] for query in queries.captured_queries))
+
+    def test_cart_item_fields(self):
+        CartItem.objects.create(user=self.user, meal=self.meal, quantity=2)
+        response = self.client.get(reverse('get-cart') + '?fields=quantity,meal.title')
+        self.assertEqual(response.data['items'], [{'meal': {'title': 'Curry'}, 'quantity': 2}])
+        self.assertEqual(response.data['total_amount'], Decimal('16.00'))
+
+    def test_serializers_follow_nested_selection(self):
+        meal = Meal.objects.with_reviews().get(pk=self.meal.pk)
+        data = MealSerializer(meal, context={'fields': parse_fields('title,reviews.user.username')}).data
+        self.assertEqual(data, {'title': 'Curry', 'reviews': [{'user': {'username': 'nia'}}]})
+
+
+@override_settings(MEAL_CACHE_TIMEOUT=0)
+class MealSearchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.user = User.objects.create_user('omar', 'omar@example.com', 'secret123')
+        self.client.force_authenticate(self.user)
+        self.url = reverse('meal-list-create')
+        for title, price in (
+            ('Chicken soup with chicken', '6.00'), ('Chicken curry', '9.50'),
+            ('Crème brûlée', '4.25'), ('Green tea', '2.00'),
+        ):
+            Meal.objects.create(title=title, price=Decimal(price), imageurl='https://example.com/meal.png')
+
+    def search(self, query):
+        response = self.client.get(self.url + query)
+        self.assertEqual(response.status_code, 200)
+        return [meal['title'] for meal in response.data['results']]
+
+    def test_ranked_prefix_search(self):
+        self.assertEqual(self.search('?q=chick'), ['Chicken soup with chicken', 'Chicken curry'])
+        self.assertEqual(self.search('?q=chicken+cur'), ['Chicken curry'])
+        self.assertEqual(self.search('?q=creme'), ['Crème brûlée'])
+
+    def test_index_follows_writes_that_bypass_signals(self):
+        Meal.objects.filter(title='Green tea').update(title='Chicken tea')
+        Meal.objects.filter(title='Chicken curry').delete()
+        row = {'external_id': 'x1', 'title': 'Chicken wings', 'price': '7.00', 'imageurl': 'https://example.com/w.png'}
+        import_meals([row])
+        self.assertEqual(set(self.search('?q=chicken')), {'Chicken soup with chicken', 'Chicken tea', 'Chicken wings'})
+        # Re-importing goes through the ON CONFLICT DO UPDATE path
+        import_meals([{**row, 'title': 'Buffalo wings'}])
+        self.assertEqual(self.search('?q=wings'), ['Buffalo wings'])
+
+    def test_price_and_rating_filters(self):
+        self.assertEqual(self.search('?min_price=4.25&max_price=9&ordering=price'), ['Crème brûlée', 'Chicken soup with chicken'])
+        meal = Meal.objects.get(title='Green tea')
+        Review.objects.create(meal=meal, user=self.user, rating=5, comment='Fresh')
+        Meal.objects.rebuild_rating_counters()
+        self.assertEqual(self.search('?min_rating=4.5'), ['Green tea'])
+        self.assertEqual(self.search('?ordering=-average_rating&page_size=1'), ['Green tea'])
+
+    def test_relevance_pages_follow_the_cursor(self):
+        titles = []
+        url = self.url + '?q=chicken&page_size=1'
+        while url:
+            response = self.client.get(url)
+            titles += [meal['title'] for meal in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(titles, ['Chicken soup with chicken', 'Chicken curry'])
+
+    @override_settings(SEARCH_RANKED_MATCHES=1)
+    def test_relevance_ranks_only_the_newest_matches(self):
+        self.assertEqual(self.search('?q=chicken'), ['Chicken curry'])
+        self.assertEqual(self.search('?q=chicken&ordering=-created_at'), ['Chicken curry', 'Chicken soup with chicken'])
+
+    def test_invalid_parameters(self):
+        for query in ('?ordering=title', '?ordering=relevance', '?min_price=cheap', '?min_rating=nan'):
+            response = self.client.get(self.url + query)
+            self.assertEqual(response.status_code, 400, query)
+            self.assertIn('error', response.data)
+
+
+@override_settings(MEAL_CACHE_TIMEOUT=0, RANKING_PRIOR_RATING=3.0, RANKING_PRIOR_WEIGHT=5)
+class MealRankingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.users = [User.objects.create_user(f'critic{i}', f'critic{i}@example.com', 'secret123') for i in range(6)]
+        self.client.force_authenticate(self.users[0])
+        self.once = Meal.objects.create(title='Lucky', price=Decimal('5.00'), imageurl='https://example.com/lucky.png')
+        self.steady = Meal.objects.create(title='Steady', price=Decimal('5.00'), imageurl='https://example.com/steady.png')
+
+    def review(self, meal, user, rating):
+        self.client.force_authenticate(user)
+        response = self.client.post(reverse('meal-reviews', args=[meal.pk]), {'rating': rating, 'comment': 'ok'}, format='json')
+        self.assertEqual(response.status_code, 200)
+
+    def scores(self):
+        return {
+            ranking.meal_id: (round(ranking.bayesian_score, 6), ranking.trending_score)
+            for ranking in MealRanking.objects.all()
+        }
+
+    def test_bayesian_order_favours_many_good_reviews(self):
+        self.review(self.once, self.users[0], 5)
+        for user in self.users:
+            self.review(self.steady, user, 4)
+
+        response = self.client.get(reverse('meal-top'))
+        self.assertEqual([meal['title'] for meal in response.data['results']], ['Steady', 'Lucky'])
+        self.assertEqual(response.data['results'][1]['score'], round((5 * 3.0 + 5) / 6, 3))
+
+    def test_incremental_updates_match_a_rebuild(self):
+        self.review(self.once, self.users[0], 5)
+        self.review(self.once, self.users[1], 2)
+        self.review(self.steady, self.users[0], 3)
+        review = Review.objects.get(meal=self.once, user=self.users[1])
+        self.client.force_authenticate(self.users[1])
+        self.client.put(reverse('update-review', args=[self.once.pk, review.pk]), {'rating': 4}, format='json')
+        self.client.force_authenticate(self.users[0])
+        self.client.delete(reverse('delete-review', args=[self.steady.pk, Review.objects.get(meal=self.steady).pk]))
+
+        incremental = self.scores()
+        self.assertEqual(set(incremental), {self.once.pk})
+        call_command('rebuild_meal_rankings', stdout=StringIO())
+        rebuilt = self.scores()
+        self.assertEqual(rebuilt[self.once.pk][0], incremental[self.once.pk][0])
+        self.assertAlmostEqual(rebuilt[self.once.pk][1], incremental[self.once.pk][1])
+
+    def test_trending_prefers_recent_reviews(self):
+        self.review(self.once, self.users[0], 5)
+        self.review(self.steady, self.users[0], 5)
+        self.review(self.steady, self.users[1], 5)
+        Review.objects.filter(meal=self.steady).update(created_at=timezone.now() - timedelta(days=30))
+        call_command('rebuild_meal_rankings', stdout=StringIO())
+
+        response = self.client.get(reverse('meal-top') + '?by=trending&fields=title')
+        self.assertEqual([meal['title'] for meal in response.data['results']], ['Lucky', 'Steady'])
+        self.assertAlmostEqual(response.data['results'][0]['score'], 1.0, places=3)
+
+    @override_settings(RANKING_TRENDING_HALF_LIFE_HOURS=6)
+    def test_trending_survives_short_half_lives_far_from_the_epoch(self):
+        # 2**(half-lives since the epoch) would be about 2**29000 by then
+        with mock.patch('django.utils.timezone.now', return_value=timezone.now().replace(year=2046)):
+            self.review(self.once, self.users[0], 5)
+            self.review(self.once, self.users[1], 3)
+            self.review(self.steady, self.users[0], 4)
+            review = Review.objects.get(meal=self.once, user=self.users[1])
+            self.client.force_authenticate(self.users[1])
+            response = self.client.put(reverse('update-review', args=[self.once.pk, review.pk]), {'rating': 5}, format='json')
+            self.assertEqual(response.status_code, 200)
+            self.client.force_authenticate(self.users[0])
+            response = self.client.delete(reverse('delete-review', args=[self.steady.pk, Review.objects.get(meal=self.steady).pk]))
+            self.assertEqual(response.status_code, 200)
+
+            response = self.client.get(reverse('meal-top') + '?by=trending&fields=title')
+        self.assertEqual([meal['title'] for meal in response.data['results']], ['Lucky'])
+        self.assertAlmostEqual(response.data['results'][0]['score'], 2.0, places=3)
+
+    def test_unknown_ranking(self):
+        response = self.client.get(reverse('meal-top') + '?by=price')
+        self.assertEqual(response.status_code, 400)
+
+
+@override_settings(MEAL_CACHE_TIMEOUT=0, MEAL_EMBEDDED_REVIEWS=2)
+class MealReviewListTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.meal = Meal.objects.create(title='Ramen', price=Decimal('11.00'), imageurl='https://example.com/ramen.png')
+        self.users = [User.objects.create_user(f'diner{i}', f'diner{i}@example.com', 'secret123') for i in range(5)]
+        self.client.force_authenticate(self.users[0])
+        for rating, user in enumerate(self.users, start=1):
+            Review.objects.create(meal=self.meal, user=user, rating=rating, comment=f'{rating} stars')
+        Meal.objects.rebuild_rating_counters()
+        self.url = reverse('meal-reviews', args=[self.meal.pk])
+
+    def test_pages_newest_first(self):
+        ratings = []
+        url = self.url + '?page_size=2'
+        while url:
+            with self.assertNumQueries(2):
+                response = self.client.get(url)
+            ratings += [review['rating'] for review in response.data['results']]
+            url = response.data['next']
+        self.assertEqual(ratings, [5, 4, 3, 2, 1])
+        self.assertEqual(response.data['results'][0]['user']['username'], 'diner0')
+
+    def test_rating_filters(self):
+        response = self.client.get(self.url + '?rating=1,5')
+        self.assertEqual([review['rating'] for review in response.data['results']], [5, 1])
+        response = self.client.get(self.url + '?min_rating=2&max_rating=3&fields=rating')
+        self.assertEqual(response.data['results'], [{'rating': 3}, {'rating': 2}])
+
+    def test_invalid_filters_and_missing_meal(self):
+        self.assertEqual(self.client.get(self.url + '?rating=6').status_code, 400)
+        self.assertEqual(self.client.get(self.url + '?min_rating=1,2').status_code, 400)
+        self.assertEqual(self.client.get(reverse('meal-reviews', args=[self.meal.pk + 1])).status_code, 404)
+
+    def test_meal_payloads_embed_only_the_latest_reviews(self):
+        response = self.client.get(reverse('meal-detail', args=[self.meal.pk]))
+        self.assertEqual([review['rating'] for review in response.data['reviews']], [5, 4])
+        self.assertEqual(response.data['review_count'], 5)
+
+        response = self.client.get(reverse('meal-list-create') + '?expand=reviews&reviews_limit=50')
+        self.assertEqual(len(response.data['results'][0]['reviews']), 2)
+
+        Review.objects.filter(user=self.users[0]).delete()
+        response = self.client.post(self.url, {'rating': 5, 'comment': 'Again'}, format='json')
+        self.assertEqual(len(response.data['reviews']), 2)
+
+
+@override_settings(MEAL_CACHE_TIMEOUT=0)
+class RequestTimingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_user('alice', 'alice@example.com', 'secret123'))
+        Meal.objects.create(title='Pho', price=Decimal('9.50'), imageurl='https://example.com/pho.png')
+
+    def test_server_timing_header(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('meal-list-create'))
+        timing = response['Server-Timing']
+        self.assertIn(f'desc="{len(queries)} queries"', timing)
+        for metric in ('db;dur=', 'app;dur=', 'render;dur=', 'total;dur='):
+            self.assertIn(metric, timing)
+
+    def test_fast_requests_are_not_logged(self):
+        with self.assertNoLogs('myapp.performance'):
+            self.client.get(reverse('meal-list-create'))
+
+    @override_settings(REQUEST_TIMING_SLOW_MS=0)
+    def test_slow_requests_log_their_slowest_queries(self):
+        with self.assertLogs('myapp.performance', 'WARNING') as logs:
+            self.client.get(reverse('meal-list-create'))
+        self.assertEqual(len(logs.records), 1)
+        self.assertIn('GET /api/meals/ -> 200', logs.output[0])
+        self.assertIn('myapp_meal', logs.output[0])
+
+    @override_settings(REQUEST_TIMING_QUERY_LIMIT=1)
+    def test_query_heavy_requests_are_logged(self):
+        with self.assertLogs('myapp.performance', 'WARNING'):
+            self.client.get(reverse('meal-list-create'))
+
+    @override_settings(REQUEST_TIMING_SLOW_MS=0)
+    def test_auth_endpoints_are_not_logged(self):
+        with self.assertNoLogs('myapp.performance'):
+            response = self.client.post(reverse('signin'), {'email': 'alice@example.com', 'password': 'secret123'}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('total;dur=', response['Server-Timing'])
+
+
+@override_settings(MEAL_CACHE_TIMEOUT=0)
+class QueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Query counts must not grow with the number of meals, reviews or cart items"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user('alice', 'alice@example.com', 'secret123')
+        self.client.force_authenticate(self.user)
+        reviewers = [User.objects.create_user(f'diner{i}', f'diner{i}@example.com', 'x') for i in range(4)]
+        self.meals = [
+            Meal.objects.create(title=f'Meal {i}', price=Decimal('5.00') + i, imageurl='https://example.com/meal.png')
+            for i in range(12)
+        ]
+        for meal in self.meals:
+            for rating, reviewer in enumerate(reviewers, start=2):
+                Review.objects.create(meal=meal, user=reviewer, rating=rating, comment='Good')
+            CartItem.objects.create(user=self.user, meal=meal, quantity=1)
+        Meal.objects.rebuild_rating_counters()
+        call_command('rebuild_meal_rankings', stdout=StringIO())
+
+    def test_meal_reads(self):
+        meal = self.meals[0]
+        budgets = [
+            (reverse('meal-list-create'), 3),
+            (reverse('meal-list-create') + '?expand=reviews', 4),
+            (reverse('meal-list-create') + '?q=meal&ordering=-price', 3),
+            (reverse('meal-detail', args=[meal.pk]), 3),
+            (reverse('meal-reviews', args=[meal.pk]), 2),
+            (reverse('meal-top') + '?by=trending', 2),
+        ]
+        for url, budget in budgets:
+            with self.subTest(url=url), self.assertQueryBudget(budget):
+                self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_cart_and_users(self):
+        with self.assertQueryBudget(3):
+            self.assertEqual(self.client.get(reverse('get-cart')).status_code, 200)
+        self.client.force_authenticate(User.objects.create_user('admin', 'admin@example.com', 'secret123'))
+        with self.assertQueryBudget(1):
+            self.assertEqual(self.client.get(reverse('list-users')).status_code, 200)
+
+    def test_budget_failure_lists_the_queries(self):
+        with self.assertRaisesMessage(AssertionError, '2 queries executed, budget is 1:\n1. SELECT'):
+            with self.assertQueryBudget(1):
+                list(Meal.objects.all())
+                list(Review.objects.all())
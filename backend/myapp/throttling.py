@@ -0,0 +1,59 @@
+import hashlib
+
+from rest_framework.throttling import SimpleRateThrottle
+
+
+class TokenBucketThrottle(SimpleRateThrottle):
+    """
+    Token bucket on top of SimpleRateThrottle's rate parsing and cache keys.
+    A rate of 'N/period' allows bursts of N requests and refills N tokens
+    per period, so steady traffic below the rate is never rejected.
+    """
+
+    def allow_request(self, request, view):
+        if self.rate is None:
+            return True
+
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        now = self.timer()
+        tokens, updated = self.cache.get(self.key, (self.num_requests, now))
+        refill = (now - updated) * self.num_requests / self.duration
+        tokens = min(self.num_requests, tokens + refill)
+
+        if tokens < 1:
+            self.wait_seconds = (1 - tokens) * self.duration / self.num_requests
+            self.cache.set(self.key, (tokens, now), self.duration)
+            return False
+
+        self.wait_seconds = None
+        self.cache.set(self.key, (tokens - 1, now), self.duration)
+        return True
+
+    def wait(self):
+        return self.wait_seconds
+
+
+class SigninIPThrottle(TokenBucketThrottle):
+    scope = 'signin_ip'
+
+    def get_cache_key(self, request, view):
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+class SigninEmailThrottle(TokenBucketThrottle):
+    """Limits guesses against one account, whichever addresses they come from"""
+    scope = 'signin_email'
+
+    def get_cache_key(self, request, view):
+        email = request.data.get('email')
+        if not isinstance(email, str) or not email.strip():
+            return None
+        ident = hashlib.md5(email.strip().lower().encode('utf-8')).hexdigest()
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+
+class SignupIPThrottle(SigninIPThrottle):
+    scope = 'signup_ip'
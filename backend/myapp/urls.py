@@ -1,21 +1,31 @@
 from django.urls import path
-from . import views
+from . import views, async_views
 
 urlpatterns = [
     path('signup/', views.signup_view, name='signup'),
     path('signin/', views.signin_view, name='signin'),
     path('meals/', views.MealListCreateView.as_view(), name='meal-list-create'),
+    path('meals/bulk/', views.bulk_import_meals, name='meal-bulk-import'),
+    path('meals/cache-stats/', views.meal_cache_stats, name='meal-cache-stats'),
+    path('meals/top/', views.top_meals, name='meal-top'),
     path('meals/<int:pk>/', views.MealDetailView.as_view(), name='meal-detail'),
-    path('meals/<int:meal_id>/reviews/', views.add_review, name='add-review'),
+    path('meals/<int:meal_id>/reviews/', views.meal_reviews, name='meal-reviews'),
     path('meals/<int:meal_id>/reviews/<int:review_id>/', views.update_review, name='update-review'),
     path('meals/<int:meal_id>/reviews/<int:review_id>/delete/', views.delete_review, name='delete-review'),
     path('users/', views.list_users, name='list-users'),
     path('users/<int:user_id>/toggle-status/', views.toggle_user_status, name='toggle-user-status'),
+    path('export/<str:resource>/', views.export_data, name='export-data'),
     
     # Cart endpoints
     path('cart/', views.get_cart, name='get-cart'),
     path('cart/add/', views.add_to_cart, name='add-to-cart'),
+    path('cart/batch/', views.batch_update_cart, name='batch-update-cart'),
     path('cart/item/<int:item_id>/', views.update_cart_item, name='update-cart-item'),
     path('cart/item/<int:item_id>/remove/', views.remove_from_cart, name='remove-from-cart'),
     path('cart/clear/', views.clear_cart, name='clear-cart'),
+
+    # Async (ASGI-native) read endpoints
+    path('async/meals/', async_views.meal_list, name='async-meal-list'),
+    path('async/meals/<int:pk>/', async_views.meal_detail, name='async-meal-detail'),
+    path('async/cart/', async_views.cart, name='async-cart'),
 ]
\ No newline at end of file
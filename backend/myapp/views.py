@@ -1,24 +1,45 @@
+from datetime import datetime, time
+from decimal import Decimal
+
+from django.conf import settings
 from django.shortcuts import render, get_object_or_404
 from rest_framework import generics, status, permissions
 from rest_framework.response import Response
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
 from django.contrib.auth.models import User
-from .serializers import SignUpSerializer, MealSerializer, ReviewSerializer, UserSerializer, CartItemSerializer
-from .models import Meal, Review, CartItem
+from django.core.handlers.asgi import ASGIRequest
+from django.db import IntegrityError, transaction
+from django.db.models import Count
+from django.db.models.functions import Lower
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from .serializers import SignUpSerializer, MealSerializer, ReviewSerializer, UserSerializer, CartItemSerializer, CartBatchOperationSerializer
+from .serializers import MEAL_FIELDS, cart_item_values, field_columns, flat_cart_item, flat_meals, flat_review, meal_values, render_fields, review_values
+from .fieldsets import branch, get_expand, get_fields, wants
+from .search import search_meals
+from .rankings import review_added, review_changed, review_removed, trending_now
+from .models import Meal, MealRanking, Review, CartItem
+from .authentication import issue_token, set_user_active
+from .throttling import SigninEmailThrottle, SigninIPThrottle, SignupIPThrottle
+from .pagination import KeysetPagination, UserKeysetPagination
+from .cache import bump_catalogue_version, cached_catalogue_response, get_cache_stats
+from .importer import IMPORT_FORMATS, ImportInterrupted, guess_format, import_meals, read_rows
+from .export import EXPORT_FORMATS, EXPORTS, export_response
+from .conditional import cart_validators, conditional_response, meal_detail_validators, meal_list_validators
 
 # Create your views here.
 
 @api_view(['POST'])
+@throttle_classes([SignupIPThrottle])
 def signup_view(request):
     serializer = SignUpSerializer(data=request.data)
     if serializer.is_valid():
         try:
             user = serializer.save()
-            refresh = RefreshToken.for_user(user)
+            refresh = issue_token(user)
             return Response({
                 'token': str(refresh.access_token),
                 'user': {
@@ -27,7 +48,7 @@ def signup_view(request):
                     'is_admin': False
                 }
             })
-        except Exception as e:
+        except IntegrityError:
             return Response(
                 {'error': 'Username or email already exists'},
                 status=status.HTTP_400_BAD_REQUEST
@@ -38,19 +59,25 @@ def signup_view(request):
     )
 
 @api_view(['POST'])
+@throttle_classes([SigninIPThrottle, SigninEmailThrottle])
 def signin_view(request):
+    # Throttles run before the view body, so rejected attempts never reach
+    # the password hasher. check_password re-hashes on success whenever
+    # PASSWORD_HASH_ITERATIONS has changed.
     data = request.data
     email = data.get('email')
     password = data.get('password')
 
-    if not email or not password:
+    if not isinstance(email, str) or not isinstance(password, str) or not email or not password:
         return Response(
             {'error': 'Please provide both email and password'},
             status=status.HTTP_400_BAD_REQUEST
         )
 
     try:
-        user = User.objects.get(email=email)
+        # Case-insensitive match served by the partial LOWER(email) unique
+        # index, whose WHERE email <> '' has to be repeated for it to apply
+        user = User.objects.annotate(email_lower=Lower('email')).get(email_lower=email.lower(), email__ne='')
     except User.DoesNotExist:
         return Response(
             {'error': 'Invalid email or password'},
@@ -69,7 +96,7 @@ def signin_view(request):
             status=status.HTTP_401_UNAUTHORIZED
         )
 
-    refresh = RefreshToken.for_user(user)
+    refresh = issue_token(user)
     return Response({
         'token': str(refresh.access_token),
         'user': {
@@ -79,33 +106,262 @@ def signin_view(request):
         }
     })
 
+def include_reviews(params, default=False):
+    """
+    Whether meals embed their reviews: ?fields= decides when given, else
+    ?expand=reviews (or ?include=reviews) and ?reviews_limit=N turn them on
+    for the list; the detail view has them by default.
+    """
+    fields = get_fields(params)
+    if fields is not None:
+        return 'reviews' in fields
+    return default or 'reviews' in get_expand(params) or 'reviews_limit' in params
+
+def get_reviews_limit(params):
+    """
+    How many of the most recent reviews a meal embeds: ?reviews_limit=N, at
+    most MEAL_EMBEDDED_REVIEWS. The rest are paged through the reviews
+    endpoint.
+    """
+    limit = settings.MEAL_EMBEDDED_REVIEWS
+    try:
+        requested = int(params['reviews_limit'])
+    except (KeyError, ValueError):
+        return limit
+    return min(requested, limit) if requested >= 0 else limit
+
+def meal_queryset(params, detail=False):
+    # Model instances for MealSerializer, which the async views render from;
+    # the sync views read .values() rows instead. Rating stats live on Meal
+    # and reviews are prefetched, so a list costs a fixed number of queries
+    # regardless of how many meals there are. Only the columns and relations
+    # ?fields= asks for are loaded.
+    fields = get_fields(params)
+    queryset = Meal.objects.only(*meal_values(fields))
+    if include_reviews(params, default=detail):
+        review_fields = branch(fields, 'reviews')
+        queryset = queryset.with_reviews(
+            limit=get_reviews_limit(params),
+            with_user=wants(review_fields, 'user') or wants(review_fields, 'username'),
+        )
+    return queryset
+
 class MealListCreateView(generics.ListCreateAPIView):
     queryset = Meal.objects.all()
     serializer_class = MealSerializer
     permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+
+    def list(self, request, *args, **kwargs):
+        # Reads never touch get_queryset() or MealSerializer: list_values()
+        # is the only read path; both are left to create()
+        return conditional_response(
+            request,
+            meal_list_validators(request),
+            lambda: cached_catalogue_response(request, 'list', lambda: self.list_values(request)),
+        )
+
+    def list_values(self, request):
+        """The paginated, searchable list from .values() rows, skipping MealSerializer"""
+        params = request.query_params
+        fields = get_fields(params)
+        try:
+            queryset, ordering = search_meals(Meal.objects.all(), params)
+        except ValueError as e:
+            return Response(
+                {'error': str(e)},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # The ordering columns are loaded too, for the next page's cursor
+        self.paginator.ordering = ordering
+        columns = dict.fromkeys(meal_values(fields) + tuple(name.lstrip('-') for name in ordering))
+        page = self.paginate_queryset(self.filter_queryset(queryset.values(*columns)))
+        return self.get_paginated_response(
+            flat_meals(page, include_reviews(params), get_reviews_limit(params), fields)
+        )
 
     def perform_create(self, serializer):
         if not self.request.user.username == 'admin':
             raise permissions.PermissionDenied("Only admin users can create meals")
         serializer.save()
+        bump_catalogue_version()
 
 class MealDetailView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Meal.objects.all()
     serializer_class = MealSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    def get_queryset(self):
+        return Meal.objects.with_reviews(limit=settings.MEAL_EMBEDDED_REVIEWS)
+
+    def retrieve(self, request, *args, **kwargs):
+        return conditional_response(
+            request,
+            meal_detail_validators(request, kwargs['pk']),
+            lambda: cached_catalogue_response(
+                request, 'detail', lambda: self.retrieve_values(request, kwargs['pk'])
+            ),
+        )
+
+    def retrieve_values(self, request, pk):
+        """The meal and its latest reviews from .values() rows, skipping MealSerializer"""
+        params = request.query_params
+        fields = get_fields(params)
+        meal = get_object_or_404(Meal.objects.values(*meal_values(fields)), pk=pk)
+        return Response(flat_meals(
+            [meal], include_reviews(params, default=True), get_reviews_limit(params), fields
+        )[0])
+
     def perform_update(self, serializer):
         if not self.request.user.username == 'admin':
             raise permissions.PermissionDenied("Only admin users can update meals")
         serializer.save()
+        bump_catalogue_version()
 
     def perform_destroy(self, instance):
         if not self.request.user.username == 'admin':
             raise permissions.PermissionDenied("Only admin users can delete meals")
         instance.delete()
+        bump_catalogue_version()
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
+def bulk_import_meals(request):
+    """Upsert many meals keyed on external_id from an uploaded file or a JSON list"""
+    if request.user.username != 'admin':
+        return Response(
+            {'error': 'Only admin users can import meals'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    upload = request.FILES.get('file')
+    try:
+        if upload is not None:
+            import_format = request.data.get('format') or guess_format(upload.name)
+            if import_format not in IMPORT_FORMATS:
+                return Response(
+                    {'error': 'format must be one of: ' + ', '.join(IMPORT_FORMATS)},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            rows = read_rows(upload, import_format)
+        else:
+            rows = request.data if isinstance(request.data, list) else request.data.get('meals')
+            if not isinstance(rows, list):
+                return Response(
+                    {'error': 'Provide a file upload or a list of meals'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+        result = import_meals(rows)
+    except ImportInterrupted as e:
+        # Earlier batches are committed; report what was written
+        return Response(
+            {'error': f'Could not read input: {e}', **e.result},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    return Response(result)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def meal_cache_stats(request):
+    if request.user.username != 'admin':
+        return Response(
+            {'error': 'Only admin can view cache statistics'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    return Response(get_cache_stats())
+
+RANKINGS = {
+    'rating': ('bayesian_score', ('-bayesian_score', '-meal_id')),
+    'trending': ('trending_score', ('-trending_score', '-meal_id')),
+}
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def top_meals(request):
+    """Meals in precomputed ranking order: ?by=rating (default) or ?by=trending"""
+    by = request.query_params.get('by', 'rating')
+    if by not in RANKINGS:
+        return Response(
+            {'error': 'by must be one of: ' + ', '.join(RANKINGS)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return cached_catalogue_response(request, 'top', lambda: _top_meals_response(request, by))
+
+def _top_meals_response(request, by):
+    score_field, ordering = RANKINGS[by]
+    fields = get_fields(request.query_params)
+    paginator = KeysetPagination()
+    paginator.ordering = ordering
+
+    # Rows come straight off the ranking index, joined to their meals
+    columns = field_columns(MEAL_FIELDS, fields, 'meal__') + (score_field, 'meal_id')
+    page = paginator.paginate_queryset(MealRanking.objects.values(*dict.fromkeys(columns)), request)
+
+    now = timezone.now()
+    results = []
+    for row in page:
+        meal = render_fields(MEAL_FIELDS, row, fields, 'meal__')
+        score = row[score_field]
+        meal['score'] = trending_now(score, now) if by == 'trending' else round(score, 3)
+        results.append(meal)
+    return paginator.get_paginated_response(results)
+
+@api_view(['GET', 'POST'])
+@permission_classes([IsAuthenticated])
+def meal_reviews(request, meal_id):
+    if request.method == 'GET':
+        return list_reviews(request, meal_id)
+    return add_review(request, meal_id)
+
+def list_reviews(request, meal_id):
+    """
+    All of a meal's reviews, newest first, keyset paginated on
+    (created_at, id) along review_meal_created_idx. ?rating=4,5 or
+    ?min_rating= / ?max_rating= narrow them down.
+    """
+    params = request.query_params
+    try:
+        ratings = {
+            'rating__in': _parse_ratings(params.get('rating')),
+            'rating__gte': _parse_ratings(params.get('min_rating'), single=True),
+            'rating__lte': _parse_ratings(params.get('max_rating'), single=True),
+        }
+    except ValueError:
+        return Response(
+            {'error': 'Ratings must be whole numbers from 1 to 5'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    if not Meal.objects.filter(pk=meal_id).exists():
+        return Response(
+            {'error': 'Meal not found'},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    def render_page():
+        fields = get_fields(params)
+        reviews = Review.objects.filter(
+            meal_id=meal_id, **{lookup: value for lookup, value in ratings.items() if value is not None}
+        )
+        paginator = KeysetPagination()
+        columns = dict.fromkeys(review_values(fields) + ('created_at', 'id'))
+        page = paginator.paginate_queryset(reviews.values(*columns), request)
+        return paginator.get_paginated_response([flat_review(row, fields) for row in page])
+
+    return cached_catalogue_response(request, 'reviews', render_page)
+
+def _parse_ratings(value, single=False):
+    if not value:
+        return None
+    ratings = [int(rating) for rating in value.split(',')]
+    if any(not 1 <= rating <= 5 for rating in ratings) or (single and len(ratings) > 1):
+        raise ValueError(value)
+    return ratings[0] if single else ratings
+
 def add_review(request, meal_id):
     try:
         # Get the meal
@@ -125,10 +381,15 @@ def add_review(request, meal_id):
         })
         
         if serializer.is_valid():
-            # Save review with the meal and user
-            review = serializer.save(meal=meal, user=request.user)
+            # Save review with the meal and user, bumping the rating counters
+            with transaction.atomic():
+                review = serializer.save(meal=meal, user=request.user)
+                Meal.objects.filter(pk=meal.pk).adjust_rating_counters(review.rating, 1)
+                review_added(review)
+            bump_catalogue_version()
             
             # Return the updated meal data
+            meal = Meal.objects.with_reviews(limit=settings.MEAL_EMBEDDED_REVIEWS).get(pk=meal.pk)
             meal_data = MealSerializer(meal).data
             return Response(meal_data, status=status.HTTP_200_OK)
         
@@ -153,11 +414,17 @@ def update_review(request, meal_id, review_id):
     serializer = ReviewSerializer(review, data=request.data, partial=True)
     
     if serializer.is_valid():
-        # Save updated review
-        serializer.save()
+        # Save updated review and shift the rating sum by the difference
+        previous_rating = review.rating
+        with transaction.atomic():
+            review = serializer.save()
+            Meal.objects.filter(pk=meal_id).adjust_rating_counters(review.rating - previous_rating)
+            review_changed(review, previous_rating)
+        bump_catalogue_version()
         
         # Return the updated meal data
-        meal_data = MealSerializer(review.meal).data
+        meal = Meal.objects.with_reviews(limit=settings.MEAL_EMBEDDED_REVIEWS).get(pk=meal_id)
+        meal_data = MealSerializer(meal).data
         return Response(meal_data)
     
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -168,13 +435,15 @@ def delete_review(request, meal_id, review_id):
     # Get the review or return 404
     review = get_object_or_404(Review, id=review_id, meal_id=meal_id, user=request.user)
     
-    # Store meal reference before deletion
-    meal = review.meal
-    
-    # Delete the review
-    review.delete()
+    # Delete the review and take it out of the rating counters
+    with transaction.atomic():
+        review.delete()
+        Meal.objects.filter(pk=meal_id).adjust_rating_counters(-review.rating, -1)
+        review_removed(review)
+    bump_catalogue_version()
     
     # Return the updated meal data
+    meal = Meal.objects.with_reviews(limit=settings.MEAL_EMBEDDED_REVIEWS).get(pk=meal_id)
     meal_data = MealSerializer(meal).data
     return Response(meal_data)
 
@@ -187,25 +456,66 @@ def list_users(request):
             status=status.HTTP_403_FORBIDDEN
         )
     
-    users = User.objects.exclude(username='admin').order_by('date_joined')
-    user_data = []
-    
-    for user in users:
-        review_count = Review.objects.filter(user=user).count()
-        last_login = user.last_login.strftime('%Y-%m-%d %H:%M:%S') if user.last_login else None
-        date_joined = user.date_joined.strftime('%Y-%m-%d %H:%M:%S')
-        
-        user_data.append({
-            'id': user.id,
-            'username': user.username,
-            'email': user.email,
-            'is_active': user.is_active,
-            'review_count': review_count,
-            'last_login': last_login,
-            'date_joined': date_joined,
-        })
-    
-    return Response(user_data)
+    # Review counts come from one annotated query per page instead of a
+    # COUNT per user
+    users = User.objects.exclude(username='admin').annotate(review_count=Count('review'))
+
+    is_active = _parse_bool(request.query_params.get('is_active'))
+    if is_active is not None:
+        users = users.filter(is_active=is_active)
+
+    has_reviews = _parse_bool(request.query_params.get('has_reviews'))
+    if has_reviews is not None:
+        users = users.filter(review_count__gt=0) if has_reviews else users.filter(review_count=0)
+
+    joined_after = request.query_params.get('joined_after')
+    if joined_after:
+        joined_after = _parse_aware_datetime(joined_after)
+        if joined_after is None:
+            return Response(
+                {'error': 'joined_after must be a date or datetime'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        users = users.filter(date_joined__gte=joined_after)
+
+    users = users.values('id', 'username', 'email', 'is_active', 'review_count', 'last_login', 'date_joined')
+
+    paginator = UserKeysetPagination()
+    page = paginator.paginate_queryset(users, request)
+
+    user_data = [
+        {
+            **user,
+            'last_login': user['last_login'].strftime('%Y-%m-%d %H:%M:%S') if user['last_login'] else None,
+            'date_joined': user['date_joined'].strftime('%Y-%m-%d %H:%M:%S'),
+        }
+        for user in page
+    ]
+
+    return paginator.get_paginated_response(user_data)
+
+def _parse_aware_datetime(value):
+    """Accept a date or datetime string; naive values use the current timezone"""
+    try:
+        parsed = parse_datetime(value)
+        if parsed is None:
+            parsed_date = parse_date(value)
+            parsed = datetime.combine(parsed_date, time.min) if parsed_date else None
+    except ValueError:
+        return None
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+def _parse_bool(value):
+    if value is None:
+        return None
+    value = value.lower()
+    if value in ('true', '1', 'yes'):
+        return True
+    if value in ('false', '0', 'no'):
+        return False
+    return None
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
@@ -226,6 +536,10 @@ def toggle_user_status(request, user_id):
         
         user.is_active = not user.is_active
         user.save()
+
+        # Tokens carry is_active as a claim; overwrite the cached state so
+        # this worker doesn't wait for the entry to expire
+        set_user_active(user.pk, user.is_active)
         
         return Response({
             'id': user.id,
@@ -238,20 +552,54 @@ def toggle_user_status(request, user_id):
             status=status.HTTP_404_NOT_FOUND
         )
 
+def _cart_data(user, fields=None):
+    # Items, meals, line totals and the grand total in one query; `fields`
+    # trims each item
+    cart_items = list(CartItem.objects.filter(user=user).with_totals().values(*cart_item_values(fields)))
+
+    total_amount = cart_items[0]['cart_total'] if cart_items else Decimal('0.00')
+
+    return {
+        'items': [flat_cart_item(row, fields) for row in cart_items],
+        'total_amount': total_amount
+    }
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def export_data(request, resource):
+    """Stream a full table dump as NDJSON (default) or CSV with ?output=csv"""
+    if request.user.username != 'admin':
+        return Response(
+            {'error': 'Only admin can export data'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+
+    if resource not in EXPORTS:
+        return Response(
+            {'error': f"Unknown export '{resource}'"},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    export_format = request.query_params.get('output', 'ndjson')
+    if export_format not in EXPORT_FORMATS:
+        return Response(
+            {'error': 'output must be one of: ' + ', '.join(EXPORT_FORMATS)},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    return export_response(resource, export_format, asynchronous=isinstance(request._request, ASGIRequest))
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def get_cart(request):
     """Get user's cart with all items"""
     try:
-        cart_items = CartItem.objects.filter(user=request.user)
-        serializer = CartItemSerializer(cart_items, many=True)
-        
-        total_amount = sum(item.total_price for item in cart_items)
-        
-        return Response({
-            'items': serializer.data,
-            'total_amount': total_amount
-        })
+        # Unchanged carts are answered with 304 before anything is serialized
+        return conditional_response(
+            request,
+            cart_validators(request),
+            lambda: Response(_cart_data(request.user, get_fields(request.query_params)))
+        )
     except Exception as e:
         return Response(
             {'error': str(e)},
@@ -261,10 +609,11 @@ def get_cart(request):
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
 def add_to_cart(request):
-    """Add item to cart or increment quantity if exists"""
+    """Add item to cart; "mode": "increment" in the body adds to an existing quantity instead of replacing it"""
     try:
         meal_id = request.data.get('meal_id')
         quantity = int(request.data.get('quantity', 1))
+        mode = request.data.get('mode', 'set')
 
         if not meal_id:
             return Response(
@@ -272,25 +621,32 @@ def add_to_cart(request):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        try:
-            meal = Meal.objects.get(id=meal_id)
-        except Meal.DoesNotExist:
+        if quantity < 1:
+            return Response(
+                {'error': 'quantity must be at least 1'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if mode not in ('set', 'increment'):
+            return Response(
+                {'error': "mode must be 'set' or 'increment'"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if not Meal.objects.filter(id=meal_id).exists():
             return Response(
                 {'error': 'Meal not found'},
                 status=status.HTTP_404_NOT_FOUND
             )
 
-        # Get or create cart item
-        cart_item, created = CartItem.objects.get_or_create(
-            user=request.user,
-            meal=meal,
-            defaults={'quantity': quantity}
+        # Single-statement upsert, safe against concurrent taps
+        cart_item, created = CartItem.objects.upsert(
+            request.user,
+            meal_id,
+            quantity,
+            increment=mode == 'increment'
         )
 
-        if not created:
-            cart_item.quantity = quantity  # Use the provided quantity
-            cart_item.save()
-
         serializer = CartItemSerializer(cart_item)
         return Response(
             serializer.data,
@@ -308,6 +664,54 @@ def add_to_cart(request):
             status=status.HTTP_500_INTERNAL_SERVER_ERROR
         )
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def batch_update_cart(request):
+    """Apply many {meal_id, quantity} changes in one transaction; quantity 0 removes the item"""
+    operations = request.data if isinstance(request.data, list) else request.data.get('operations')
+    if not operations:
+        return Response(
+            {'error': 'operations is required'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    serializer = CartBatchOperationSerializer(data=operations, many=True)
+    if not serializer.is_valid():
+        return Response(
+            {'error': serializer.errors},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    # Later operations on the same meal win
+    quantities = {op['meal_id']: op['quantity'] for op in serializer.validated_data}
+
+    meals = Meal.objects.only('id').in_bulk(list(quantities))
+    missing = sorted(set(quantities) - set(meals))
+    if missing:
+        return Response(
+            {'error': 'Meal not found', 'meal_ids': missing},
+            status=status.HTTP_404_NOT_FOUND
+        )
+
+    removed = [meal_id for meal_id, quantity in quantities.items() if quantity == 0]
+    upserts = [
+        CartItem(user=request.user, meal_id=meal_id, quantity=quantity)
+        for meal_id, quantity in quantities.items() if quantity > 0
+    ]
+
+    with transaction.atomic():
+        if removed:
+            CartItem.objects.filter(user=request.user, meal_id__in=removed).delete()
+        if upserts:
+            CartItem.objects.bulk_create(
+                upserts,
+                update_conflicts=True,
+                unique_fields=['user', 'meal'],
+                update_fields=['quantity', 'updated_at'],
+            )
+
+    return Response(_cart_data(request.user))
+
 @api_view(['DELETE'])
 @permission_classes([IsAuthenticated])
 def remove_from_cart(request, item_id):
@@ -45,22 +45,34 @@ class _HomePageState extends State<HomePage> {
         return;
       }
 
-      final response = await http.get(
-        Uri.parse('http://127.0.0.1:8000/api/meals/'),
-        headers: {
-          'Authorization': 'Bearer $token',
-        },
-      );
+      // The list is paginated; follow the `next` links to load every page
+      final List<Map<String, dynamic>> loadedMeals = [];
+      // Only what the grid and MealDetailsPage read, to keep the payload small
+      String? nextUrl = 'http://127.0.0.1:8000/api/meals/?fields='
+          'id,title,price,imageurl,average_rating,review_count,'
+          'reviews.user.username,reviews.rating,reviews.comment,reviews.created_at';
+
+      while (nextUrl != null) {
+        final response = await http.get(
+          Uri.parse(nextUrl),
+          headers: {
+            'Authorization': 'Bearer $token',
+          },
+        );
 
-      if (response.statusCode == 200) {
-        final List<dynamic> data = json.decode(response.body);
-        setState(() {
-          meals = data.cast<Map<String, dynamic>>();
-          _isLoading = false;
-        });
-      } else {
-        throw Exception('Failed to load meals');
+        if (response.statusCode != 200) {
+          throw Exception('Failed to load meals');
+        }
+
+        final Map<String, dynamic> data = json.decode(response.body);
+        loadedMeals.addAll((data['results'] as List<dynamic>).cast<Map<String, dynamic>>());
+        nextUrl = data['next'] as String?;
       }
+
+      setState(() {
+        meals = loadedMeals;
+        _isLoading = false;
+      });
     } catch (e) {
       setState(() => _isLoading = false);
       if (mounted) {
@@ -44,23 +44,32 @@ class _ManageMealsPageState extends State<ManageMealsPage> {
 
   Future<void> fetchMeals() async {
     try {
-      final response = await http.get(
-        Uri.parse('http://127.0.0.1:8000/api/meals/'),
-        headers: {
-          'Content-Type': 'application/json',
-          'Authorization': 'Bearer $token',
-        },
-      );
+      // The list is paginated; follow the `next` links to load every page
+      final List<Map<String, dynamic>> loadedMeals = [];
+      String? nextUrl = 'http://127.0.0.1:8000/api/meals/';
 
-      if (response.statusCode == 200) {
-        final List<dynamic> data = json.decode(response.body);
-        setState(() {
-          meals = List<Map<String, dynamic>>.from(data);
-          isLoading = false;
-        });
-      } else {
-        throw Exception('Failed to load meals');
+      while (nextUrl != null) {
+        final response = await http.get(
+          Uri.parse(nextUrl),
+          headers: {
+            'Content-Type': 'application/json',
+            'Authorization': 'Bearer $token',
+          },
+        );
+
+        if (response.statusCode != 200) {
+          throw Exception('Failed to load meals');
+        }
+
+        final Map<String, dynamic> data = json.decode(response.body);
+        loadedMeals.addAll(List<Map<String, dynamic>>.from(data['results']));
+        nextUrl = data['next'] as String?;
       }
+
+      setState(() {
+        meals = loadedMeals;
+        isLoading = false;
+      });
     } catch (e) {
       print('Error fetching meals: $e');
       setState(() {
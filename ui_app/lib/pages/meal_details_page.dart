@@ -20,6 +20,11 @@ class _MealDetailsPageState extends State<MealDetailsPage> {
   String? _username;
   String? _token;
   bool _isSubmitting = false;
+  // Meals embed only their latest few reviews; the rest are paged in from
+  // GET /api/meals/<id>/reviews/ on request
+  List<dynamic>? _pagedReviews;
+  String? _nextReviewsUrl;
+  bool _isLoadingReviews = false;
 
   @override
   void initState() {
@@ -72,6 +77,9 @@ class _MealDetailsPageState extends State<MealDetailsPage> {
           widget.meal['reviews'] = responseData['reviews'];
           widget.meal['average_rating'] = responseData['average_rating'];
           widget.meal['review_count'] = responseData['review_count'];
+          // Back to the embedded latest reviews, which now include this one
+          _pagedReviews = null;
+          _nextReviewsUrl = null;
         });
         _commentController.clear();
         if (mounted) {
@@ -98,8 +106,71 @@ class _MealDetailsPageState extends State<MealDetailsPage> {
     }
   }
 
+  Future<void> _loadMoreReviews() async {
+    if (_token == null || _isLoadingReviews) return;
+
+    setState(() => _isLoadingReviews = true);
+
+    try {
+      final url = _nextReviewsUrl ??
+          'http://127.0.0.1:8000/api/meals/${widget.meal['id']}/reviews/'
+              '?fields=user.username,rating,comment,created_at';
+      final response = await http.get(
+        Uri.parse(url),
+        headers: {
+          'Authorization': 'Bearer $_token',
+        },
+      );
+
+      if (response.statusCode != 200) {
+        throw Exception('Failed to load reviews');
+      }
+
+      final Map<String, dynamic> data = json.decode(response.body);
+      setState(() {
+        _pagedReviews = [...?_pagedReviews, ...(data['results'] as List<dynamic>)];
+        _nextReviewsUrl = data['next'] as String?;
+      });
+    } catch (e) {
+      if (mounted) {
+        ScaffoldMessenger.of(context).showSnackBar(
+          SnackBar(content: Text('Error: ${e.toString()}')),
+        );
+      }
+    } finally {
+      if (mounted) {
+        setState(() => _isLoadingReviews = false);
+      }
+    }
+  }
+
+  Widget _buildMoreReviewsButton(int shown) {
+    final reviewCount = widget.meal['review_count'] as int? ?? 0;
+    final hasMore = _pagedReviews == null ? reviewCount > shown : _nextReviewsUrl != null;
+    if (!hasMore || _token == null) {
+      return const SizedBox.shrink();
+    }
+
+    return Center(
+      child: TextButton(
+        onPressed: _isLoadingReviews ? null : _loadMoreReviews,
+        child: _isLoadingReviews
+            ? const SizedBox(
+                height: 20,
+                width: 20,
+                child: CircularProgressIndicator(
+                  strokeWidth: 2,
+                ),
+              )
+            : Text(_pagedReviews == null
+                ? 'Show all $reviewCount reviews'
+                : 'Load more reviews'),
+      ),
+    );
+  }
+
   Widget _buildReviewsList() {
-    final reviews = (widget.meal['reviews'] as List<dynamic>?) ?? [];
+    final reviews = _pagedReviews ?? (widget.meal['reviews'] as List<dynamic>?) ?? [];
     
     if (reviews.isEmpty) {
       return const Center(
@@ -113,6 +184,15 @@ class _MealDetailsPageState extends State<MealDetailsPage> {
       );
     }
 
+    return Column(
+      children: [
+        _buildReviewCards(reviews),
+        _buildMoreReviewsButton(reviews.length),
+      ],
+    );
+  }
+
+  Widget _buildReviewCards(List<dynamic> reviews) {
     return ListView.builder(
       shrinkWrap: true,
       physics: const NeverScrollableScrollPhysics(),
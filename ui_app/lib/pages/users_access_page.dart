@@ -29,28 +29,38 @@ class _UsersAccessPageState extends State<UsersAccessPage> {
 
   Future<void> _fetchUsers() async {
     try {
-      final response = await http.get(
-        Uri.parse('http://127.0.0.1:8000/api/users/'),
-        headers: {
-          'Content-Type': 'application/json',
-          'Authorization': 'Bearer $_token',
-        },
-      );
+      // The list is paginated; follow the `next` links to load every page
+      final List<Map<String, dynamic>> loadedUsers = [];
+      String? nextUrl = 'http://127.0.0.1:8000/api/users/';
 
-      if (response.statusCode == 200) {
-        final List<dynamic> data = json.decode(response.body);
-        setState(() {
-          users = List<Map<String, dynamic>>.from(data);
-          _isLoading = false;
-        });
-      } else {
-        if (mounted) {
-          ScaffoldMessenger.of(context).showSnackBar(
-            const SnackBar(content: Text('Failed to load users')),
-          );
+      while (nextUrl != null) {
+        final response = await http.get(
+          Uri.parse(nextUrl),
+          headers: {
+            'Content-Type': 'application/json',
+            'Authorization': 'Bearer $_token',
+          },
+        );
+
+        if (response.statusCode != 200) {
+          if (mounted) {
+            ScaffoldMessenger.of(context).showSnackBar(
+              const SnackBar(content: Text('Failed to load users')),
+            );
+          }
+          setState(() => _isLoading = false);
+          return;
         }
-        setState(() => _isLoading = false);
+
+        final Map<String, dynamic> data = json.decode(response.body);
+        loadedUsers.addAll(List<Map<String, dynamic>>.from(data['results']));
+        nextUrl = data['next'] as String?;
       }
+
+      setState(() {
+        users = loadedUsers;
+        _isLoading = false;
+      });
     } catch (e) {
       if (mounted) {
         ScaffoldMessenger.of(context).showSnackBar(